@@ -38,6 +38,7 @@ class DCONFIG_MT_quick(bpy.types.Menu):
             layout.separator()
             dc.setup_op(layout, "mesh.edges_select_sharp", icon='RESTRICT_SELECT_OFF', text="Select Sharp", sharpness=math.radians(45.1))
             dc.setup_op(layout, "mesh.select_face_by_sides", text="Select N-Gons", type='NOTEQUAL', number=4, extend=False)
+            dc.setup_op(layout, "dconfig.select_distorted", text="Select Distorted")
             dc.setup_op(layout, "mesh.region_to_loop", text="Select Boundary Loop")
 
             layout.separator()
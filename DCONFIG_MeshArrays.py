@@ -0,0 +1,802 @@
+# ------------------------------------------------------------
+# Copyright(c) 2018-2020 Jesse Yurkovich
+# Licensed under the MIT License <http://opensource.org/licenses/MIT>.
+# See the LICENSE file in the repo root for full license information.
+# ------------------------------------------------------------
+
+#
+# NumPy views of mesh data for bulk analysis
+#
+
+from functools import cached_property
+import hashlib
+import math
+
+import numpy as np
+
+
+def foreach_get(collection, prop, dtype, count, width=1):
+    data = np.empty(count * width, dtype=dtype)
+    collection.foreach_get(prop, data)
+    return data if width == 1 else data.reshape(-1, width)
+
+
+# Mesh data pulled into flat arrays with foreach_get; each array is only fetched on first use
+class MeshArrays:
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.vert_count = len(mesh.vertices)
+        self.edge_count = len(mesh.edges)
+        self.face_count = len(mesh.polygons)
+        self.loop_count = len(mesh.loops)
+
+    @cached_property
+    def positions(self):
+        return foreach_get(self.mesh.vertices, "co", np.float32, self.vert_count, 3)
+
+    @cached_property
+    def edge_verts(self):
+        return foreach_get(self.mesh.edges, "vertices", np.int32, self.edge_count, 2)
+
+    @cached_property
+    def face_sizes(self):
+        return foreach_get(self.mesh.polygons, "loop_total", np.int32, self.face_count)
+
+    @cached_property
+    def loop_starts(self):
+        return foreach_get(self.mesh.polygons, "loop_start", np.int32, self.face_count)
+
+    @cached_property
+    def face_normals(self):
+        return foreach_get(self.mesh.polygons, "normal", np.float32, self.face_count, 3)
+
+    @cached_property
+    def face_centers(self):
+        return foreach_get(self.mesh.polygons, "center", np.float32, self.face_count, 3)
+
+    @cached_property
+    def loop_verts(self):
+        return foreach_get(self.mesh.loops, "vertex_index", np.int32, self.loop_count)
+
+    @cached_property
+    def loop_edges(self):
+        return foreach_get(self.mesh.loops, "edge_index", np.int32, self.loop_count)
+
+    @cached_property
+    def uvs(self):
+        # Only the first UV layer is considered
+        if len(self.mesh.uv_layers) == 0:
+            return None
+
+        return foreach_get(self.mesh.uv_layers[0].data, "uv", np.float32, self.loop_count, 2)
+
+    @cached_property
+    def loop_triangles(self):
+        self.mesh.calc_loop_triangles()
+        return foreach_get(self.mesh.loop_triangles, "loops", np.int32, len(self.mesh.loop_triangles), 3)
+
+    @cached_property
+    def loop_triangle_faces(self):
+        return foreach_get(self.mesh.loop_triangles, "polygon_index", np.int32, len(self.loop_triangles))
+
+    @cached_property
+    def uv_triangles(self):
+        return None if self.uvs is None else self.uvs[self.loop_triangles]
+
+    @cached_property
+    def vert_edge_counts(self):
+        return np.bincount(self.edge_verts.ravel(), minlength=self.vert_count)
+
+    @cached_property
+    def edge_creases(self):
+        attribute = self.mesh.attributes.get("crease_edge")
+        if attribute is None:
+            return np.zeros(self.edge_count, dtype=np.float32)
+
+        return foreach_get(attribute.data, "value", np.float32, self.edge_count)
+
+    @cached_property
+    def content_hash(self):
+        digest = hashlib.blake2b(digest_size=16)
+        for data in (self.positions, self.edge_verts, self.face_sizes, self.loop_verts, self.edge_creases, self.uvs):
+            if data is not None:
+                digest.update(data.tobytes())
+        return digest.hexdigest()
+
+
+#
+# Face shape queries
+#
+
+def face_distortion(arrays, faces=None):
+    # Largest angle, per face (of all faces, or just the given ones), between the face normal and the normal of any of its corners
+    if faces is None:
+        faces = np.arange(arrays.face_count)
+    if len(faces) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    sizes = arrays.face_sizes[faces]
+    starts = arrays.loop_starts[faces]
+    face_of_loop, loops = expand_ranges(np.arange(len(faces)), starts, sizes)
+    first_loops = np.cumsum(sizes) - sizes
+    corner = np.arange(len(loops)) - first_loops[face_of_loop]
+    prev_loop = starts[face_of_loop] + (corner - 1) % sizes[face_of_loop]
+    next_loop = starts[face_of_loop] + (corner + 1) % sizes[face_of_loop]
+
+    positions = arrays.positions.astype(np.float64)
+    loop_verts = arrays.loop_verts
+    co = positions[loop_verts[loops]]
+    corner_normals = np.cross(positions[loop_verts[prev_loop]] - co, positions[loop_verts[next_loop]] - co)
+
+    # Degenerate corners fall back to the face normal, as BM_loop_calc_face_normal does
+    face_normals = arrays.face_normals[faces].astype(np.float64)
+    loop_face_normals = face_normals[face_of_loop]
+    length = np.linalg.norm(corner_normals, axis=1)
+    degenerate = length == 0.0
+    corner_normals[degenerate] = loop_face_normals[degenerate]
+    length[degenerate] = 1.0
+    corner_normals /= length[:, None]
+
+    # Corner normals facing away are flipped first, so only the absolute cosine matters
+    cosine = np.abs(np.einsum('ij,ij->i', corner_normals, loop_face_normals))
+    angles = np.arccos(np.clip(cosine, 0.0, 1.0))
+
+    # A face without a valid normal is as distorted as it gets, matching Vector.angle's fallback
+    max_angles = np.maximum.reduceat(angles, first_loops)
+    max_angles[np.linalg.norm(face_normals, axis=1) == 0.0] = np.pi
+    return max_angles
+
+
+def distorted_faces(arrays, max_distortion, faces=None):
+    return (2 * face_distortion(arrays, faces)) >= max_distortion
+
+
+def face_pair_shared_verts(arrays, a, b):
+    # Per pair of faces (a[i], b[i]), how many vertices they have in common and one of those vertices, -1 for none
+    pair_a, loops_a = expand_ranges(np.arange(a.size), arrays.loop_starts[a], arrays.face_sizes[a])
+    pair_b, loops_b = expand_ranges(np.arange(b.size), arrays.loop_starts[b], arrays.face_sizes[b])
+    keys_a = pair_a * arrays.vert_count + arrays.loop_verts[loops_a]
+    keys_b = pair_b * arrays.vert_count + arrays.loop_verts[loops_b]
+
+    matches = np.isin(keys_b, keys_a)
+    counts = np.bincount(pair_b[matches], minlength=a.size)
+    verts = np.full(a.size, -1, dtype=np.int64)
+    verts[pair_b[matches]] = arrays.loop_verts[loops_b[matches]]
+    return counts, verts
+
+
+def segments_cross_triangles(starts, ends, tris, eps=1e-7):
+    # Points where each segment meets its triangle, given as (N, 3, 3) corners, and whether it does; segments lying in the plane never do
+    normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    length = np.linalg.norm(normals, axis=1)
+    normals /= np.where(length > 0.0, length, 1.0)[:, None]
+
+    d0 = np.einsum('ij,ij->i', starts - tris[:, 0], normals)
+    d1 = np.einsum('ij,ij->i', ends - tris[:, 0], normals)
+    scale = np.maximum(np.linalg.norm(ends - starts, axis=1), 1e-30)
+    flat = (np.abs(d0) <= eps * scale) & (np.abs(d1) <= eps * scale)
+    crosses = (length > 0.0) & ~flat & (d0 * d1 <= 0.0)
+    t = np.where(crosses, d0 / np.where(crosses, d0 - d1, 1.0), 0.0)
+    points = starts + t[:, None] * (ends - starts)
+
+    # Barycentric coordinates of the crossing point
+    v0, v1, v2 = tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0], points - tris[:, 0]
+    d00, d01, d11 = np.einsum('ij,ij->i', v0, v0), np.einsum('ij,ij->i', v0, v1), np.einsum('ij,ij->i', v1, v1)
+    d20, d21 = np.einsum('ij,ij->i', v2, v0), np.einsum('ij,ij->i', v2, v1)
+    denominator = np.where(crosses, d00 * d11 - d01 * d01, 1.0)
+    u = (d11 * d20 - d01 * d21) / denominator
+    v = (d00 * d21 - d01 * d20) / denominator
+    crosses &= (u >= -eps) & (v >= -eps) & (u + v <= 1.0 + eps)
+    return points, crosses
+
+
+def faces_meet_apart_from(arrays, a, b, verts, eps=1e-6):
+    # True for each pair of faces (a[i], b[i]) whose triangles meet anywhere but at the vertex verts[i] they share
+    # Every loop triangle of one face against every loop triangle of the other
+    pair_a, tris_a = face_triangles(arrays, a)
+    pair_b, tris_b = face_triangles(arrays, b)
+    starts = np.searchsorted(pair_b, pair_a, side='left')
+    ends = np.searchsorted(pair_b, pair_a, side='right')
+    entry, tri_b = expand_ranges(np.arange(len(pair_a)), starts, ends - starts)
+    pair, tri_a, tri_b = pair_a[entry], tris_a[entry], tris_b[tri_b]
+
+    positions = arrays.positions.astype(np.float64)
+    p = positions[arrays.loop_verts[arrays.loop_triangles[tri_a]]]
+    q = positions[arrays.loop_verts[arrays.loop_triangles[tri_b]]]
+    corner = positions[verts[pair]]
+    size = np.maximum(np.ptp(np.concatenate((p, q), axis=1), axis=1).max(axis=1), 1e-30)
+
+    # An edge of either triangle passing through the other; crossings at the shared vertex are just the two faces touching
+    meets = np.zeros(len(pair), dtype=bool)
+    for first, second in ((p, q), (q, p)):
+        for i in range(3):
+            points, crosses = segments_cross_triangles(first[:, i], first[:, (i + 1) % 3], second)
+            meets |= crosses & (np.linalg.norm(points - corner, axis=1) > eps * size)
+
+    # Coplanar triangles fold over each other when they overlap in their plane; sharing a corner alone is only touching
+    normals_p = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+    normals_q = np.cross(q[:, 1] - q[:, 0], q[:, 2] - q[:, 0])
+    coplanar = np.linalg.norm(np.cross(normals_p, normals_q), axis=1) <= eps * np.linalg.norm(normals_p, axis=1) * np.linalg.norm(normals_q, axis=1)
+    coplanar &= np.abs(np.einsum('nkj,nj->nk', q - p[:, :1], normals_p)).max(axis=1) <= eps * size * np.linalg.norm(normals_p, axis=1)
+    coplanar = np.flatnonzero(coplanar & ~meets)
+    if len(coplanar):
+        axes = np.argsort(np.abs(normals_p[coplanar]), axis=1)[:, :2]
+        flat_p = np.take_along_axis(p[coplanar], axes[:, None, :], axis=2)
+        flat_q = np.take_along_axis(q[coplanar], axes[:, None, :], axis=2)
+        meets[coplanar] = triangles_overlap(flat_p, flat_q, eps * size[coplanar])
+
+    found = np.zeros(len(a), dtype=bool)
+    found[pair[meets]] = True
+    return found
+
+
+def face_edge_verts(arrays, faces):
+    # Vertex pairs of every side of the given faces, following each face's winding
+    starts = arrays.loop_starts[faces]
+    sizes = arrays.face_sizes[faces]
+    owners, loops = expand_ranges(np.arange(len(starts)), starts, sizes)
+    following = starts[owners] + (loops - starts[owners] + 1) % sizes[owners]
+    return np.stack((arrays.loop_verts[loops], arrays.loop_verts[following]), axis=1)
+
+
+#
+# Sampling
+#
+
+# Golden ratio stride; consecutive visits land far apart and any prefix of the visiting order is spread evenly
+SAMPLE_STRIDE = 0.6180339887498949
+
+
+def stratified_indices(count, start, stop):
+    # The [start, stop) slice of a fixed visiting order of range(count) which covers the range evenly at every length
+    stride = max(1, int(count * SAMPLE_STRIDE))
+    while math.gcd(stride, count) != 1:
+        stride += 1
+
+    return (np.arange(start, stop, dtype=np.int64) * stride) % count
+
+
+def proportion_interval(hits, sampled, z=1.96):
+    # Wilson score interval of a proportion measured on a sample; 95% confidence by default
+    if sampled == 0:
+        return 0.0, 1.0
+
+    p = hits / sampled
+    denominator = 1 + z * z / sampled
+    center = (p + z * z / (2 * sampled)) / denominator
+    half = z * math.sqrt(p * (1 - p) / sampled + z * z / (4 * sampled * sampled)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+#
+# Proximity queries
+#
+
+# Spatial hash primes and the 13 neighbor cells of the positive half-space; the other half is covered by symmetry
+CELL_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.uint64)
+NEIGHBOR_OFFSETS = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1) if (x, y, z) > (0, 0, 0)]
+CELL_SCALE = 2
+
+
+def hash_cells(cells):
+    # Hash collisions only add candidates which the exact distance test removes later
+    cells = cells.astype(np.uint64)
+    return (cells[:, 0] * CELL_HASH_PRIMES[0]) ^ (cells[:, 1] * CELL_HASH_PRIMES[1]) ^ (cells[:, 2] * CELL_HASH_PRIMES[2])
+
+
+def expand_ranges(sources, starts, lengths):
+    # Pair each source with every index in [start, start + length)
+    total = int(lengths.sum())
+    firsts = np.repeat(sources, lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    seconds = np.repeat(starts, lengths) + offsets
+    return firsts, seconds
+
+
+def search_sorted(keys, needles):
+    # Searching with sorted needles is far more cache friendly than scattered lookups
+    order = np.argsort(needles)
+    slots = np.empty(len(needles), dtype=np.int64)
+    slots[order] = np.searchsorted(keys, needles[order])
+    return slots
+
+
+def find_close_pairs(positions, dist):
+    # Returns index arrays (a, b), a < b, of every pair of points no further than dist apart
+    count = len(positions)
+    if count < 2 or dist <= 0.0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    cell_size = dist * CELL_SCALE
+    scaled = np.asarray(positions, dtype=np.float64) / cell_size
+    cells = np.floor(scaled).astype(np.int64)
+    frac = scaled - cells
+    near_low = frac < (1.0 / CELL_SCALE)
+    near_high = frac > (1.0 - 1.0 / CELL_SCALE)
+
+    keys = hash_cells(cells)
+    order = np.argsort(keys, kind='stable')
+    cell_keys, cell_starts, cell_counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    # Points sharing a cell; each point pairs with those after it in sorted order
+    cell_of_point = np.repeat(np.arange(len(cell_keys)), cell_counts)
+    sorted_index = np.arange(count)
+    after = cell_counts[cell_of_point] - (sorted_index - cell_starts[cell_of_point]) - 1
+    first, second = expand_ranges(sorted_index, sorted_index + 1, after)
+    pairs_a = [order[first]]
+    pairs_b = [order[second]]
+
+    # Points in neighboring cells; only points within dist of the shared cell boundary can reach across
+    for offset in NEIGHBOR_OFFSETS:
+        mask = np.ones(count, dtype=bool)
+        for axis, step in enumerate(offset):
+            if step > 0:
+                mask &= near_high[:, axis]
+            elif step < 0:
+                mask &= near_low[:, axis]
+
+        points = np.flatnonzero(mask)
+        if len(points) == 0:
+            continue
+
+        neighbor_keys = hash_cells(cells[points] + np.array(offset, dtype=np.int64))
+        slot = np.minimum(search_sorted(cell_keys, neighbor_keys), len(cell_keys) - 1)
+        found = cell_keys[slot] == neighbor_keys
+        first, second = expand_ranges(points[found], cell_starts[slot[found]], cell_counts[slot[found]])
+        pairs_a.append(first)
+        pairs_b.append(order[second])
+
+    a = np.concatenate(pairs_a)
+    b = np.concatenate(pairs_b)
+    a, b = np.minimum(a, b), np.maximum(a, b)
+    keep = a != b
+    a, b = a[keep], b[keep]
+
+    delta = np.asarray(positions[a], dtype=np.float64) - positions[b]
+    keep = np.einsum('ij,ij->i', delta, delta) <= dist * dist
+    unique_pairs = np.unique(a[keep] * count + b[keep])
+    return unique_pairs // count, unique_pairs % count
+
+
+def unique_rows(rows):
+    # Exact duplicate rows; -0.0 is folded into 0.0 so both compare equal
+    rows = np.ascontiguousarray(rows + 0)
+    view = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(view, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def find_doubles(positions, dist):
+    # Vertices within dist of a lower indexed vertex, i.e. the vertices a merge would remove
+    if len(positions) < 2:
+        return np.empty(0, dtype=np.int32)
+
+    # Exact duplicates are collapsed first so stacked vertices do not produce quadratic pair counts
+    first, _ = unique_rows(positions)
+    exact = np.setdiff1d(np.arange(len(positions)), first)
+    a, b = find_close_pairs(positions[first], dist)
+    near = np.maximum(first[a], first[b])
+    return np.union1d(exact, near).astype(np.int32)
+
+
+class PointGrid:
+    # Points collapsed to their exact positions and hashed into cells of size dist, for repeated queries on parts of the points
+    def __init__(self, positions, dist):
+        self.dist = dist
+        self.first, self.inverse = unique_rows(positions)
+        self.positions = np.asarray(positions[self.first], dtype=np.float64)
+        self.cells = np.floor(self.positions / dist).astype(np.int64) if dist > 0.0 else None
+        if self.cells is not None:
+            keys = hash_cells(self.cells)
+            self.order = np.argsort(keys, kind='stable')
+            self.cell_keys, self.cell_starts, self.cell_counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def has_lower_neighbor(self, indices):
+        # True for each given point with a lower indexed point within dist, i.e. a vertex a merge would remove, as in find_doubles
+        indices = np.asarray(indices, dtype=np.int64)
+        unique = self.inverse[indices]
+        found = self.first[unique] < indices
+        if self.cells is None:
+            return found
+
+        # Cells are dist wide, so only the 27 cells around a point can hold its neighbors
+        for offset in [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)]:
+            neighbor_keys = hash_cells(self.cells[unique] + np.array(offset, dtype=np.int64))
+            slot = np.minimum(search_sorted(self.cell_keys, neighbor_keys), len(self.cell_keys) - 1)
+            hit = np.flatnonzero(self.cell_keys[slot] == neighbor_keys)
+            query, entries = expand_ranges(hit, self.cell_starts[slot[hit]], self.cell_counts[slot[hit]])
+            others = self.order[entries]
+            delta = self.positions[others] - self.positions[unique[query]]
+            close = (self.first[others] < indices[query]) & (np.einsum('ij,ij->i', delta, delta) <= self.dist * self.dist)
+            found[query[close]] = True
+
+        return found
+
+
+def group_labels(count, a, b):
+    # Lowest index in the group of each element, where the pairs (a, b) chain elements into groups
+    labels = np.arange(count)
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, low)
+        np.minimum.at(updated, b, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def merge_targets(positions, dist):
+    # The vertex each vertex merges into, one vertex per group of vertices chained together within dist; unmerged vertices map to themselves
+    if len(positions) < 2:
+        return np.arange(len(positions))
+
+    first, inverse = unique_rows(positions)
+    a, b = find_close_pairs(positions[first], dist)
+    return first[group_labels(len(first), a, b)][inverse]
+
+
+# Fixed per-owner salts for grouping points by the owners they are shared between
+OWNER_HASH_SEED = 0x5EED
+
+
+def group_owner_sets(starts, lengths, entry_owners, weights):
+    # Groups points whose (owner, weight) entries are identical; returns the group of each point and the first point of each group
+    salts = np.random.default_rng(OWNER_HASH_SEED).integers(1, 2**63, int(entry_owners.max()) + 1, dtype=np.uint64)
+    hashes = salts[entry_owners] * (weights.astype(np.uint64) * np.uint64(2) + np.uint64(1))
+    signatures = np.add.reduceat(hashes, starts)
+    first, group = unique_rows(np.column_stack((lengths.astype(np.int64), signatures.view(np.int64))))
+
+    # Hash collisions would merge different owner sets; any point not matching its group's first point becomes a group of its own
+    point_of_entry = np.repeat(np.arange(len(starts)), lengths)
+    entry_offset = np.arange(len(entry_owners)) - starts[point_of_entry]
+    rep_entry = starts[first[group]][point_of_entry] + entry_offset
+    mismatch = (entry_owners != entry_owners[rep_entry]) | (weights != weights[rep_entry])
+    bad = np.unique(point_of_entry[mismatch])
+    if len(bad):
+        group[bad] = len(first) + np.arange(len(bad))
+        first = np.concatenate((first, bad))
+
+    return group, first
+
+
+def find_coincident_owner_pairs(positions, owners, dist):
+    # Counts point pairs within dist that belong to different owners; returns (owner_a, owner_b, count) arrays
+    empty = np.empty(0, dtype=np.int64)
+    if len(positions) < 2 or dist <= 0.0:
+        return empty, empty, empty
+
+    # Identical positions are collapsed across every owner, so stacked copies of an object cost no more than one copy
+    positions = np.asarray(positions, dtype=np.float32)
+    owners = np.asarray(owners, dtype=np.int64)
+    first, inverse = unique_rows(positions)
+    span = int(owners.max()) + 1
+    entries, weights = np.unique(inverse.astype(np.int64) * span + owners, return_counts=True)
+    entry_points = entries // span
+    entry_owners = entries % span
+    lengths = np.bincount(entry_points, minlength=len(first))
+    starts = np.cumsum(lengths) - lengths
+
+    # Points shared by the same owners in the same numbers are expanded into owner pairs only once
+    group, group_first = group_owner_sets(starts, lengths, entry_owners, weights)
+    group_size = np.bincount(group, minlength=len(group_first))
+
+    # Owners sharing a position: each entry of a group's first point pairs with the entries after it
+    rep_starts = starts[group_first]
+    rep_lengths = lengths[group_first]
+    rep_entry = np.repeat(np.arange(len(group_first)), rep_lengths)
+    entry = np.repeat(rep_starts, rep_lengths) + np.arange(rep_lengths.sum()) - np.repeat(np.cumsum(rep_lengths) - rep_lengths, rep_lengths)
+    after = rep_starts[rep_entry] + rep_lengths[rep_entry] - entry - 1
+    ea, eb = expand_ranges(entry, entry + 1, after)
+    pair_a = [entry_owners[ea]]
+    pair_b = [entry_owners[eb]]
+    pair_weights = [weights[ea] * weights[eb] * group_size[rep_entry[np.repeat(np.arange(len(entry)), after)]]]
+
+    # Owners of nearby positions: each pair of groups crosses every owner of one with every owner of the other
+    a, b = find_close_pairs(positions[first], dist)
+    if len(a):
+        group_pairs, multiplicity = np.unique(group[a] * len(group_first) + group[b], return_counts=True)
+        ga, gb = group_pairs // len(group_first), group_pairs % len(group_first)
+        pair_index, ea = expand_ranges(np.arange(len(ga)), rep_starts[ga], rep_lengths[ga])
+        entry_index, eb = expand_ranges(np.arange(len(ea)), rep_starts[gb[pair_index]], rep_lengths[gb[pair_index]])
+        ea = ea[entry_index]
+        pair_index = pair_index[entry_index]
+        pair_a.append(entry_owners[ea])
+        pair_b.append(entry_owners[eb])
+        pair_weights.append(weights[ea] * weights[eb] * multiplicity[pair_index])
+
+    owner_a = np.concatenate(pair_a)
+    owner_b = np.concatenate(pair_b)
+    pair_weights = np.concatenate(pair_weights)
+    keep = owner_a != owner_b
+    if not keep.any():
+        return empty, empty, empty
+
+    lo = np.minimum(owner_a[keep], owner_b[keep])
+    hi = np.maximum(owner_a[keep], owner_b[keep])
+    pair_keys, pair_index = np.unique(lo * span + hi, return_inverse=True)
+    counts = np.bincount(pair_index.ravel(), weights=pair_weights[keep]).astype(np.int64)
+    return pair_keys // span, pair_keys % span, counts
+
+
+BOX_PAIR_CHUNK = 1 << 20
+
+
+def sweep_and_prune(mins, maxs):
+    # Pairs (a < b) of overlapping axis aligned boxes, swept along the axis where the boxes are spread the most
+    empty = np.empty(0, dtype=np.int64)
+    if len(mins) < 2:
+        return empty, empty
+
+    axis = int(np.argmax((mins + maxs).var(axis=0)))
+    order = np.argsort(mins[:, axis], kind='stable')
+
+    # Each box overlaps, along the sweep axis, every later box which starts before it ends
+    ends = np.searchsorted(mins[order, axis], maxs[order, axis], side='right')
+    starts = np.arange(1, len(order) + 1)
+    lengths = np.maximum(ends - starts, 0)
+
+    # Candidates are checked on the other axes in bounded chunks of boxes
+    others = [i for i in range(3) if i != axis]
+    mins, maxs = mins[:, others], maxs[:, others]
+    splits = np.searchsorted(np.cumsum(lengths), np.arange(BOX_PAIR_CHUNK, lengths.sum(), BOX_PAIR_CHUNK))
+    bounds = np.unique(np.concatenate(([0], splits, [len(order)])))
+    results_a, results_b = [], []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        first, second = expand_ranges(np.arange(lo, hi), starts[lo:hi], lengths[lo:hi])
+        a, b = order[first], order[second]
+        keep = np.all((mins[a] <= maxs[b]) & (mins[b] <= maxs[a]), axis=1)
+        results_a.append(a[keep])
+        results_b.append(b[keep])
+
+    a, b = np.concatenate(results_a), np.concatenate(results_b)
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+#
+# UV overlap queries
+#
+
+UV_OVERLAP_EPSILON = 1e-6
+UV_GRID_MAX_CELLS = 4096
+# Triangles covering more grid cells than this are swept against the others instead of being rasterized into the grid
+UV_GRID_MAX_TRIANGLE_CELLS = 64
+UV_PAIR_CHUNK = 1 << 20
+
+
+def chunked_ranges(sources, starts, lengths, chunk=UV_PAIR_CHUNK):
+    # expand_ranges in pieces of about chunk pairs, so dense overlaps are never materialized all at once
+    if len(sources) == 0:
+        return
+    splits = np.searchsorted(np.cumsum(lengths), np.arange(chunk, lengths.sum(), chunk))
+    bounds = np.unique(np.concatenate(([0], splits, [len(sources)])))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        yield expand_ranges(sources[lo:hi], starts[lo:hi], lengths[lo:hi])
+
+
+def grid_triangle_pairs(tris, mins, maxs, cell_min, cells_x, cells_y, stride):
+    # One entry per (triangle, covered cell), sorted by cell
+    tris, k = expand_ranges(tris, np.zeros(len(tris), dtype=np.int64), cells_x[tris] * cells_y[tris])
+    row = cells_x[tris]
+    keys = (cell_min[tris, 0] + k % row) * stride + cell_min[tris, 1] + k // row
+    order = np.argsort(keys, kind='stable')
+    tris = tris[order]
+    keys = keys[order]
+    _, cell_starts, cell_counts = np.unique(keys, return_index=True, return_counts=True)
+
+    # Every entry pairs with the entries after it in the same cell
+    cell_of_entry = np.repeat(np.arange(len(cell_counts)), cell_counts)
+    entry = np.arange(len(tris))
+    after = cell_counts[cell_of_entry] - (entry - cell_starts[cell_of_entry]) - 1
+    for first, second in chunked_ranges(entry, entry + 1, after):
+        a = tris[first]
+        b = tris[second]
+        pair_keys = keys[first]
+
+        # Bounds must overlap on both axes
+        keep = np.all((mins[a] < maxs[b]) & (mins[b] < maxs[a]), axis=1)
+        a, b, pair_keys = a[keep], b[keep], pair_keys[keep]
+
+        # Pairs sharing several cells are only kept in the cell holding the lower corner of their bounds intersection
+        corner = np.maximum(cell_min[a], cell_min[b])
+        keep = (corner[:, 0] * stride + corner[:, 1]) == pair_keys
+        yield a[keep], b[keep]
+
+
+def slab_triangle_pairs(large, small, mins, maxs):
+    # Pairs of each large triangle with the small ones whose bounds overlap it, found by sorting the small ones along x
+    if len(large) == 0 or len(small) == 0:
+        return
+    order = small[np.argsort(mins[small, 0], kind='stable')]
+    reach = float((maxs[small, 0] - mins[small, 0]).max())
+    starts = np.searchsorted(mins[order, 0], mins[large, 0] - reach, side='left')
+    ends = np.searchsorted(mins[order, 0], maxs[large, 0], side='right')
+    for a, second in chunked_ranges(large, starts, np.maximum(ends - starts, 0)):
+        b = order[second]
+        keep = np.all((mins[a] < maxs[b]) & (mins[b] < maxs[a]), axis=1)
+        yield a[keep], b[keep]
+
+
+def find_candidate_triangle_pairs(mins, maxs):
+    # Yields chunks (a, b), a < b, of triangles whose bounds overlap; a uniform grid pairs the typical triangles, sweeps the few large ones
+    count = len(mins)
+    if count < 2:
+        return
+
+    # Size cells around the typical triangle, but never so small that the grid becomes unbounded
+    origin = mins.min(axis=0)
+    extent = float((maxs.max(axis=0) - origin).max())
+    typical = float(np.median((maxs - mins).max(axis=1)))
+    cell_size = max(typical, extent / UV_GRID_MAX_CELLS, 1e-9)
+    stride = UV_GRID_MAX_CELLS + 2
+
+    cell_min = np.floor((mins - origin) / cell_size).astype(np.int64)
+    cell_max = np.floor((maxs - origin) / cell_size).astype(np.int64)
+    cells_x = cell_max[:, 0] - cell_min[:, 0] + 1
+    cells_y = cell_max[:, 1] - cell_min[:, 1] + 1
+
+    # A triangle as large as the whole atlas would otherwise enter, and pair within, thousands of cells
+    is_large = cells_x * cells_y > UV_GRID_MAX_TRIANGLE_CELLS
+    large = np.flatnonzero(is_large)
+    small = np.flatnonzero(~is_large)
+
+    chunks = [grid_triangle_pairs(small, mins, maxs, cell_min, cells_x, cells_y, stride), slab_triangle_pairs(large, small, mins, maxs)]
+    if len(large) > 1:
+        flat = np.zeros((len(large), 1))
+        a, b = sweep_and_prune(np.hstack((mins[large], flat)), np.hstack((maxs[large], flat)))
+        chunks.append([(large[a], large[b])])
+
+    for chunk in chunks:
+        for a, b in chunk:
+            yield np.minimum(a, b), np.maximum(a, b)
+
+
+def triangles_overlap(tris_a, tris_b, eps=UV_OVERLAP_EPSILON):
+    # Separating axis test on the 6 edge normals; triangles which only touch along an edge or corner do not overlap
+    separated = np.zeros(len(tris_a), dtype=bool)
+    for tris in (tris_a, tris_b):
+        for i in range(3):
+            edge = tris[:, (i + 1) % 3] - tris[:, i]
+            axis = np.column_stack((-edge[:, 1], edge[:, 0]))
+            length = np.hypot(axis[:, 0], axis[:, 1])
+            axis /= np.where(length > 0.0, length, 1.0)[:, None]
+
+            proj_a = np.einsum('nkj,nj->nk', tris_a, axis)
+            proj_b = np.einsum('nkj,nj->nk', tris_b, axis)
+            separated |= (proj_a.max(axis=1) <= proj_b.min(axis=1) + eps) | (proj_b.max(axis=1) <= proj_a.min(axis=1) + eps)
+
+    return ~separated
+
+
+def find_overlapping_triangles(tris, groups):
+    # Indices of the triangles, given as (T, 3, 2) corner coordinates, whose interior overlaps a triangle of another group
+    tris = np.asarray(tris, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+
+    # Degenerate triangles have no interior to overlap
+    candidates = np.flatnonzero(triangle_areas(tris) > UV_OVERLAP_EPSILON * UV_OVERLAP_EPSILON)
+    if len(candidates) < 2:
+        return np.empty(0, dtype=np.int64)
+
+    # Stacked copies of a triangle are collapsed into one, whatever the order of their corners
+    corners = tris[candidates]
+    corner_order = np.lexsort((corners[:, :, 1], corners[:, :, 0]))
+    corners = np.take_along_axis(corners, corner_order[:, :, None], axis=1)
+    first, inverse = unique_rows(corners.reshape(-1, 6))
+    unique_tris = corners[first]
+    member_groups = groups[candidates]
+
+    # Only whether a triangle meets one group or several matters, so the lowest and highest group stand for all of them
+    no_group = np.iinfo(np.int64).max
+    group_min = np.full(len(first), no_group)
+    group_max = np.full(len(first), -1)
+    np.minimum.at(group_min, inverse, member_groups)
+    np.maximum.at(group_max, inverse, member_groups)
+
+    # Groups of the triangles overlapping each unique one, starting with its own copies when they differ in group
+    stacked = group_min != group_max
+    partner_min = np.where(stacked, group_min, no_group)
+    partner_max = np.where(stacked, group_max, -1)
+    for a, b in find_candidate_triangle_pairs(unique_tris.min(axis=1), unique_tris.max(axis=1)):
+        keep = triangles_overlap(unique_tris[a], unique_tris[b])
+        a, b = a[keep], b[keep]
+        np.minimum.at(partner_min, a, group_min[b])
+        np.minimum.at(partner_min, b, group_min[a])
+        np.maximum.at(partner_max, a, group_max[b])
+        np.maximum.at(partner_max, b, group_max[a])
+
+    # A copy is overlapped unless every triangle overlapping it is in its own group
+    partner_min = partner_min[inverse]
+    partner_max = partner_max[inverse]
+    overlapped = (partner_max >= 0) & ((partner_min != partner_max) | (partner_min != member_groups))
+    return candidates[overlapped]
+
+
+#
+# UV distortion queries
+#
+
+def triangle_areas(tris):
+    # Areas of (T, 3, 2) or (T, 3, 3) triangles
+    e1 = tris[:, 1] - tris[:, 0]
+    e2 = tris[:, 2] - tris[:, 0]
+    if tris.shape[2] == 2:
+        return 0.5 * np.abs(e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0])
+
+    return 0.5 * np.linalg.norm(np.cross(e1, e2), axis=1)
+
+
+def triangle_angles(tris):
+    # Interior angle at each corner of (T, 3, 2) or (T, 3, 3) triangles
+    angles = np.empty(tris.shape[:2], dtype=np.float64)
+    for i in range(3):
+        u = tris[:, (i + 1) % 3] - tris[:, i]
+        v = tris[:, (i + 2) % 3] - tris[:, i]
+        cross = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0] if tris.shape[2] == 2 else np.linalg.norm(np.cross(u, v), axis=1)
+        angles[:, i] = np.arctan2(np.abs(cross), np.einsum('ij,ij->i', u, v))
+
+    return angles
+
+
+def face_triangles(arrays, faces):
+    # (position in faces, loop triangle) of every loop triangle of the given faces; loop triangles are ordered by face
+    triangle_faces = arrays.loop_triangle_faces
+    starts = np.searchsorted(triangle_faces, faces, side='left')
+    ends = np.searchsorted(triangle_faces, faces, side='right')
+    return expand_ranges(np.arange(len(faces)), starts, ends - starts)
+
+
+def uv_area_totals(arrays):
+    # Total (3D area, UV area) of the mesh
+    tris = arrays.positions[arrays.loop_verts[arrays.loop_triangles]].astype(np.float64)
+    return triangle_areas(tris).sum(), triangle_areas(arrays.uv_triangles.astype(np.float64)).sum()
+
+
+def face_uv_areas(arrays):
+    # Per face (3D area, UV area), summed over the face's triangles
+    faces = arrays.loop_triangle_faces
+    tris = arrays.positions[arrays.loop_verts[arrays.loop_triangles]].astype(np.float64)
+    areas = np.bincount(faces, weights=triangle_areas(tris), minlength=arrays.face_count)
+    uv_areas = np.bincount(faces, weights=triangle_areas(arrays.uv_triangles.astype(np.float64)), minlength=arrays.face_count)
+    return areas, uv_areas
+
+
+def stretched_uv_faces(arrays, max_area_stretch, max_angle_distortion):
+    return np.flatnonzero(uv_stretch_mask(arrays, np.arange(arrays.face_count), max_area_stretch, max_angle_distortion)).astype(np.int32)
+
+
+def uv_stretch_mask(arrays, faces, max_area_stretch, max_angle_distortion, totals=None):
+    # Per given face, whether its share of the UV layout differs from its share of the surface by more than max_area_stretch times,
+    # or its UV corners bend more than max_angle_distortion away from the 3D corners
+    # Shares are of the totals from uv_area_totals; without them, of the given faces, which must then be the whole mesh
+    owner, loop_tris = face_triangles(arrays, faces)
+    tris = arrays.positions[arrays.loop_verts[arrays.loop_triangles[loop_tris]]].astype(np.float64)
+    uv_tris = arrays.uv_triangles[loop_tris].astype(np.float64)
+    areas = np.bincount(owner, weights=triangle_areas(tris), minlength=len(faces))
+    uv_areas = np.bincount(owner, weights=triangle_areas(uv_tris), minlength=len(faces))
+
+    total_area, total_uv_area = totals if totals is not None else (areas.sum(), uv_areas.sum())
+    if total_area <= 0.0 or total_uv_area <= 0.0:
+        return np.zeros(len(faces), dtype=bool)
+
+    valid = areas > total_area * 1e-9
+    ratio = (uv_areas / total_uv_area) / np.where(valid, areas / total_area, 1.0)
+    stretched = valid & ((ratio > max_area_stretch) | (ratio * max_area_stretch < 1.0))
+
+    corner_error = np.abs(triangle_angles(tris) - triangle_angles(uv_tris)).max(axis=1)
+    angle_error = np.zeros(len(faces), dtype=np.float64)
+    np.maximum.at(angle_error, owner, corner_error)
+    stretched |= valid & (angle_error > max_angle_distortion)
+
+    return stretched
+
+
+def texel_density(arrays):
+    # UV units per mesh unit, from the total UV and surface areas; None for meshes with no area in either
+    areas, uv_areas = face_uv_areas(arrays)
+    total_area, total_uv_area = areas.sum(), uv_areas.sum()
+    if total_area <= 0.0 or total_uv_area <= 0.0:
+        return None
+
+    return float(np.sqrt(total_uv_area / total_area))
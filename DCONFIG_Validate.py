@@ -8,12 +8,26 @@
 # Model validator
 #
 
-from collections import (namedtuple, defaultdict)
+from array import array
+from collections import (namedtuple, defaultdict, Counter)
+from contextlib import (contextmanager, nullcontext)
+from functools import cached_property
+import fnmatch
+import hashlib
+import itertools
+import json
 import math
 import re
+import time
 
 import bpy
 import bmesh
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ExportHelper
+from mathutils.bvhtree import BVHTree
+import numpy as np
+from . import DCONFIG_MeshArrays as ma
+from . import DCONFIG_ValidateCache as vc
 from . import DCONFIG_Utils as dc
 
 #
@@ -21,12 +35,91 @@ from . import DCONFIG_Utils as dc
 #
 
 Rule = namedtuple('Rule', ['category', 'label'])
-ObjectRuleData = namedtuple('ObjectRuleData', ['obj', 'bm'])
-CollectionRuleData = namedtuple('CollectionRuleData', ['collection'])
-RuleResult = namedtuple('RuleResult', ['rule', 'is_error', 'obj', 'detail'])
+ObjectRuleData = namedtuple('ObjectRuleData', ['obj'])
+CollectionRuleData = namedtuple('CollectionRuleData', ['collection', 'settings'])
+RuleResult = namedtuple('RuleResult', ['rule', 'is_error', 'obj', 'detail', 'elements', 'estimated', 'skipped'], defaults=(None, False, False))
+
+# Mesh elements a result refers to; domain is 'VERT', 'EDGE' or 'FACE'
+ElementSet = namedtuple('ElementSet', ['domain', 'indices'])
+
+# A rule measured on part of a mesh: the offending elements found among the first `sampled` of `total` elements
+Estimate = namedtuple('Estimate', ['indices', 'sampled', 'total'])
+
+
+class RuleRegistry:
+    # Rules declare their Scope ('OBJECT', 'MESH' or 'COLLECTION'), the shared Inputs they read and a Cost class
+    Costs = ('CHEAP', 'MODERATE', 'EXPENSIVE')
+    Inputs = ('ARRAYS', 'BMESH', 'BVH')
+
+    # Per-collection profiles and the most expensive rules they run
+    Profiles = {'QUICK': 'CHEAP', 'STANDARD': 'MODERATE', 'FULL': 'EXPENSIVE'}
+
+    def __init__(self):
+        self.rules = defaultdict(list)
+        self.scopes = {}
+
+    def register(self, cls):
+        self.rules[cls.Scope].append(cls())
+        self.scopes[cls.rule] = cls.Scope
+        return cls
+
+    def cost_rank(self, rule):
+        return self.Costs.index(rule.Cost)
+
+    def input_rank(self, rule):
+        return max((self.Inputs.index(name) for name in rule.Inputs), default=-1)
+
+    def schedule(self, scope, max_cost='EXPENSIVE'):
+        # Cheapest first; within a cost class, rules reading the same inputs run back to back, otherwise in registration order
+        limit = self.Costs.index(max_cost)
+        rules = [rule for rule in self.rules[scope] if self.cost_rank(rule) <= limit]
+        return sorted(rules, key=lambda rule: (self.cost_rank(rule), self.input_rank(rule)))
+
+
+rule_registry = RuleRegistry()
+
+
+class MeshRuleData:
+    # Structures which several rules need are built on first use and shared for the rest of the pass
+    def __init__(self, mesh, arrays, settings, timings=None):
+        self.mesh = mesh
+        self.arrays = arrays
+        self.settings = settings
+        self.timings = timings
+
+    @cached_property
+    def bm(self):
+        # Work from a standalone BMesh of the mesh data; no edit mode or selection state required
+        with measure_time(self.timings, 'PHASE', 'BMesh creation'):
+            bm = bmesh.new()
+            bm.from_mesh(self.mesh)
+        return bm
+
+    def free(self):
+        if 'bm' in self.__dict__:
+            self.bm.free()
+
+    @cached_property
+    def bvh(self):
+        # Leaf indices are face indices
+        return BVHTree.FromBMesh(self.bm)
+
+    # Sampled rules query these once per chunk of their sample
+
+    @cached_property
+    def point_grid(self):
+        return ma.PointGrid(self.arrays.positions, self.settings.coincident_distance)
+
+    @cached_property
+    def uv_area_totals(self):
+        return ma.uv_area_totals(self.arrays)
 
 
 class BaseObjectRule:
+    Scope = 'OBJECT'
+    Inputs = frozenset()
+    Cost = 'CHEAP'
+
     BAD_NAMES = [
         'BezierCircle', 'BezierCurve',
         'Circle', 'Cone', 'Cube', 'CurvePath', 'Cylinder',
@@ -44,15 +137,54 @@ class BaseObjectRule:
         pattern = r"({})\.?\d*$".format("|".join(self.BAD_NAMES))
         return re.match(pattern, name, re.IGNORECASE) is not None
 
-    def ready_selection(self, select_mode):
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type=select_mode)
+
+class BaseMeshRule(BaseObjectRule):
+    # Mesh rules measure the mesh data once and then report the measurement for each object using it
+    Scope = 'MESH'
+    Inputs = frozenset({'ARRAYS'})
+
+    # Rules which can be estimated from a sample of one element domain set these in approximate mode
+    Sample_Domain = None
+    Sample_Label = ""
+    # Rules whose work is capped whatever the mesh size run in approximate mode as they are
+    Bounded = False
+
+    def measure(self, data):
+        raise NotImplementedError
+
+    def report(self, obj, value):
+        raise NotImplementedError
+
+    def measure_sample(self, data, indices):
+        # Offending mask over the given elements of Sample_Domain
+        raise NotImplementedError
+
+    def report_estimate(self, obj, estimate):
+        if estimate.sampled >= estimate.total:
+            return self.report(obj, estimate.indices)
+
+        indices = np.asarray(estimate.indices, dtype=np.int32)
+        low, high = ma.proportion_interval(indices.size, estimate.sampled)
+        message = "Object '{}' contains ~{} {} (95% CI {}-{}, {} of {} sampled)".format(
+            obj.name, round(indices.size / estimate.sampled * estimate.total), self.Sample_Label,
+            round(low * estimate.total), round(high * estimate.total), estimate.sampled, estimate.total)
+        is_error = indices.size > 0
+        return RuleResult(self.rule, is_error, obj, message, ElementSet(self.Sample_Domain, indices) if is_error else None, True)
+
+    def report_elements(self, obj, domain, indices, message):
+        # Rules measuring offending elements report their count and keep their indices for selection
+        indices = np.asarray(indices, dtype=np.int32)
+        is_error = indices.size > 0
+        return RuleResult(self.rule, is_error, obj, message.format(obj.name, indices.size), ElementSet(domain, indices) if is_error else None)
 
 
 class BaseCollectionRule:
-    pass
+    Scope = 'COLLECTION'
+    Inputs = frozenset()
+    Cost = 'CHEAP'
 
 
+@rule_registry.register
 class ObjectNameRule(BaseObjectRule):
     rule = Rule('Organization', 'Object name')
 
@@ -61,6 +193,7 @@ class ObjectNameRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, "Object '{}' is named poorly".format(data.obj.name))
 
 
+@rule_registry.register
 class ObjectDataNameRule(BaseObjectRule):
     rule = Rule('Organization', 'Object data name')
 
@@ -75,128 +208,222 @@ class ObjectDataNameRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, message)
 
 
-class GeometryIsolatedVertRule(BaseObjectRule):
+@rule_registry.register
+class GeometryIsolatedVertRule(BaseMeshRule):
     rule = Rule('Geometry', 'Isolated vertices')
 
-    def execute(self, data):
-        self.ready_selection('VERT')
-        bpy.ops.mesh.select_loose(extend=False)
+    def measure(self, data):
+        return np.flatnonzero(data.arrays.vert_edge_counts == 0)
 
-        isolated_count = sum(1 for v in data.bm.verts if v.select)
-        is_error = isolated_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} isolated vertices".format(data.obj.name, isolated_count))
+    def report(self, obj, verts):
+        return self.report_elements(obj, 'VERT', verts, "Object '{}' contains {} isolated vertices")
 
 
-class GeometryCoincidentVertRule(BaseObjectRule):
+@rule_registry.register
+class GeometryCoincidentVertRule(BaseMeshRule):
     rule = Rule('Geometry', 'Coincident vertices')
+    Cost = 'MODERATE'
+    Sample_Domain = 'VERT'
+    Sample_Label = "doubled vertices"
 
-    def execute(self, data):
-        doubles = bmesh.ops.find_doubles(data.bm, verts=data.bm.verts, dist=0.0001)
-
-        doubles_count = len(doubles['targetmap'])
-        is_error = doubles_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} doubled vertices".format(data.obj.name, doubles_count))
-
+    def measure(self, data):
+        return ma.find_doubles(data.arrays.positions, data.settings.coincident_distance)
 
-class GeometryInteriorFaceRule(BaseObjectRule):
-    rule = Rule('Geometry', 'Interior faces')
+    def measure_sample(self, data, indices):
+        return data.point_grid.has_lower_neighbor(indices)
 
-    def execute(self, data):
-        self.ready_selection('FACE')
-        bpy.ops.mesh.select_interior_faces()
+    def report(self, obj, verts):
+        return self.report_elements(obj, 'VERT', verts, "Object '{}' contains {} doubled vertices")
 
-        interior_count = sum(1 for f in data.bm.faces if f.select)
-        is_error = interior_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} interior faces".format(data.obj.name, interior_count))
 
+@rule_registry.register
+class GeometryInteriorFaceRule(BaseMeshRule):
+    rule = Rule('Geometry', 'Interior faces')
+    Inputs = frozenset({'BMESH'})
+    Cost = 'EXPENSIVE'
+    Sample_Domain = 'FACE'
+    Sample_Label = "interior faces"
 
-class GeometryNonManifoldRule(BaseObjectRule):
-    rule = Rule('Geometry', 'Manifold geometry')
+    def is_face_interior(self, face):
+        # A face is interior when every one of its edges is shared by 3 or more faces
+        return all(len(e.link_faces) > 2 for e in face.edges)
 
-    def execute(self, data):
-        self.ready_selection('VERT')
-        bpy.ops.mesh.select_non_manifold(extend=False, use_boundary=False)
+    def measure(self, data):
+        return [f.index for f in data.bm.faces if self.is_face_interior(f)]
 
-        non_manifold_count = sum(1 for v in data.bm.verts if v.select)
-        is_error = non_manifold_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} non-manifold vertices".format(data.obj.name, non_manifold_count))
+    def measure_sample(self, data, indices):
+        data.bm.faces.ensure_lookup_table()
+        faces = data.bm.faces
+        return np.array([self.is_face_interior(faces[i]) for i in indices.tolist()], dtype=bool)
 
+    def report(self, obj, faces):
+        return self.report_elements(obj, 'FACE', faces, "Object '{}' contains {} interior faces")
 
-class GeometryDistortionRule(BaseObjectRule):
-    rule = Rule('Geometry', 'Distortion')
-    Max_Distortion = math.radians(40)
 
-    def is_face_distorted(self, face):
-        face_no = face.normal
-        max_angle = 0.0
+@rule_registry.register
+class GeometryNonManifoldRule(BaseMeshRule):
+    rule = Rule('Geometry', 'Manifold geometry')
+    Inputs = frozenset({'BMESH'})
+    Cost = 'EXPENSIVE'
+    Sample_Domain = 'VERT'
+    Sample_Label = "non-manifold vertices"
 
-        for loop in face.loops:
-            loop_no = loop.calc_normal()
-            if loop_no.dot(face_no) < 0.0:
-                loop_no.negate()
+    def measure(self, data):
+        # Boundaries are allowed; wire edges, edges with 3+ faces, and edges with flipped neighbors are not
+        non_manifold = set(v for v in data.bm.verts if not v.is_manifold)
+        for e in data.bm.edges:
+            if not e.is_boundary and not e.is_contiguous:
+                non_manifold.update(e.verts)
 
-            max_angle = max(max_angle, face_no.angle(loop_no, math.pi))
+        return sorted(v.index for v in non_manifold)
 
-        return (2 * max_angle) >= self.Max_Distortion
+    def measure_sample(self, data, indices):
+        # The same test from the side of each sampled vertex
+        data.bm.verts.ensure_lookup_table()
+        verts = data.bm.verts
+        return np.array([not v.is_manifold or any(not e.is_boundary and not e.is_contiguous for e in v.link_edges)
+                         for v in (verts[i] for i in indices.tolist())], dtype=bool)
 
-    def execute(self, data):
-        distored_faces = sum(1 for f in data.bm.faces if self.is_face_distorted(f))
-        is_error = distored_faces > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} distorted faces".format(data.obj.name, distored_faces))
+    def report(self, obj, verts):
+        return self.report_elements(obj, 'VERT', verts, "Object '{}' contains {} non-manifold vertices")
 
 
-class TopologyNGonRule(BaseObjectRule):
+@rule_registry.register
+class GeometryDistortionRule(BaseMeshRule):
+    rule = Rule('Geometry', 'Distortion')
+    Cost = 'MODERATE'
+    Max_Distortion = math.radians(40)
+    Sample_Domain = 'FACE'
+    Sample_Label = "distorted faces"
+
+    def measure(self, data):
+        return np.flatnonzero(ma.distorted_faces(data.arrays, self.Max_Distortion))
+
+    def measure_sample(self, data, indices):
+        return ma.distorted_faces(data.arrays, self.Max_Distortion, indices)
+
+    def report(self, obj, faces):
+        return self.report_elements(obj, 'FACE', faces, "Object '{}' contains {} distorted faces")
+
+
+@rule_registry.register
+class GeometrySelfIntersectionRule(BaseMeshRule):
+    rule = Rule('Geometry', 'Self intersections')
+    Inputs = frozenset({'ARRAYS', 'BVH'})
+    Cost = 'EXPENSIVE'
+
+    def measure(self, data):
+        pairs = np.array(data.bvh.overlap(data.bvh), dtype=np.int64).reshape(-1, 2)
+        a, b = pairs[:, 0], pairs[:, 1]
+
+        # Faces sharing an edge always touch along it; faces sharing a single vertex only count when they meet elsewhere, like a folded fan
+        keep = a != b
+        a, b = a[keep], b[keep]
+        counts, verts = ma.face_pair_shared_verts(data.arrays, a, b)
+        keep = counts == 0
+        corner = np.flatnonzero(counts == 1)
+        keep[corner] = ma.faces_meet_apart_from(data.arrays, a[corner], b[corner], verts[corner])
+        return np.unique(np.concatenate((a[keep], b[keep])))
+
+    def report(self, obj, faces):
+        return self.report_elements(obj, 'FACE', faces, "Object '{}' contains {} self-intersecting faces")
+
+
+@rule_registry.register
+class GeometryWallThicknessRule(BaseMeshRule):
+    rule = Rule('Geometry', 'Thin walls')
+    Inputs = frozenset({'ARRAYS', 'BVH'})
+    Cost = 'EXPENSIVE'
+    Bounded = True
+
+    def measure(self, data):
+        min_thickness = data.settings.min_wall_thickness
+        if min_thickness <= 0 or data.arrays.face_count == 0:
+            return None
+
+        # A fixed random order gives a sample covering the whole mesh; the work is bounded only by the ray count so results are repeatable
+        faces = np.sort(np.random.default_rng(0).permutation(data.arrays.face_count)[:data.settings.wall_thickness_max_rays])
+        directions = -data.arrays.face_normals[faces].astype(np.float64)
+        offset = min_thickness * 1e-3
+        origins = data.arrays.face_centers[faces] + directions * offset
+
+        # Rays are not cut off at the minimum; the mesh is shared, and each object using it scales the distances by its own transform
+        ray_cast = data.bvh.ray_cast
+        distances = np.full(len(faces), np.inf)
+        for i, (face, origin, direction) in enumerate(zip(faces.tolist(), origins.tolist(), directions.tolist())):
+            location, normal, index, distance = ray_cast(origin, direction)
+            # Only the far side of the same wall counts; hits facing the ray come from a separate shell or a fold
+            if index is not None and index != face and normal.dot(direction) > 0:
+                distances[i] = distance + offset
+
+        hit = np.isfinite(distances)
+        return [min_thickness, faces[hit].astype(np.int32), distances[hit], directions[hit].astype(np.float32), len(faces), data.arrays.face_count]
+
+    def report(self, obj, value):
+        if value is None:
+            return RuleResult(self.rule, False, obj, "Wall thickness check disabled")
+
+        # Each wall is as thick as its mesh-local depth stretched by the object's transform along the wall's normal
+        min_thickness, faces, distances, directions, tested, face_count = value
+        matrix = np.array(obj.matrix_world.to_3x3(), dtype=np.float64)
+        thickness = np.asarray(distances) * np.linalg.norm(np.asarray(directions, dtype=np.float64).reshape(-1, 3) @ matrix.T, axis=1)
+        thin = np.asarray(faces, dtype=np.int32)[thickness < min_thickness]
+
+        message = "Object '{}' contains {} faces on walls thinner than the minimum"
+        if tested < face_count:
+            message += " ({} of {} faces sampled)".format(tested, face_count)
+        return self.report_elements(obj, 'FACE', thin, message)
+
+
+@rule_registry.register
+class TopologyNGonRule(BaseMeshRule):
     rule = Rule('Topology', 'Ngons')
 
-    def execute(self, data):
-        self.ready_selection('FACE')
-        bpy.ops.mesh.select_face_by_sides(number=4, type='NOTEQUAL', extend=False)
-
-        face_count = len(data.bm.faces)
-        if face_count > 0:
-            ngon_count = sum(1 for f in data.bm.faces if f.select)
-            percentage = float(ngon_count) / face_count
-        else:
-            percentage = 0
+    def measure(self, data):
+        return [np.flatnonzero(data.arrays.face_sizes != 4), data.arrays.face_count]
 
+    def report(self, obj, value):
+        faces, face_count = np.asarray(value[0], dtype=np.int32), value[1]
+        percentage = float(faces.size) / face_count if face_count > 0 else 0
         is_error = percentage > 0.10
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' is composed of {:.1f}% tris/ngons".format(data.obj.name, percentage * 100))
+        message = "Object '{}' is composed of {:.1f}% tris/ngons".format(obj.name, percentage * 100)
+        return RuleResult(self.rule, is_error, obj, message, ElementSet('FACE', faces) if is_error else None)
 
 
-class TopologyLargeNGonRule(BaseObjectRule):
+@rule_registry.register
+class TopologyLargeNGonRule(BaseMeshRule):
     rule = Rule('Topology', 'Large Ngons')
 
-    def execute(self, data):
-        self.ready_selection('FACE')
-        bpy.ops.mesh.select_face_by_sides(number=6, type='GREATER', extend=False)
-
-        ngon_count = sum(1 for f in data.bm.faces if f.select)
-        is_error = ngon_count > 0
+    def measure(self, data):
+        return np.flatnonzero(data.arrays.face_sizes > 6)
 
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' is composed of {} large ngons".format(data.obj.name, ngon_count))
+    def report(self, obj, faces):
+        return self.report_elements(obj, 'FACE', faces, "Object '{}' is composed of {} large ngons")
 
 
-class TopologyPoleRule(BaseObjectRule):
+@rule_registry.register
+class TopologyPoleRule(BaseMeshRule):
     rule = Rule('Topology', 'Large poles')
 
-    def execute(self, data):
-        large_pole_count = sum(1 for v in data.bm.verts if len(v.link_edges) > 5)
-        is_error = large_pole_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} poles with 6+ edges".format(data.obj.name, large_pole_count))
+    def measure(self, data):
+        return np.flatnonzero(data.arrays.vert_edge_counts > 5)
+
+    def report(self, obj, verts):
+        return self.report_elements(obj, 'VERT', verts, "Object '{}' contains {} poles with 6+ edges")
 
 
-class TopologySubDivCreaseRule(BaseObjectRule):
+@rule_registry.register
+class TopologySubDivCreaseRule(BaseMeshRule):
     rule = Rule('Topology', 'Edge creases')
 
-    def execute(self, data):
-        edge_count = 0
+    def measure(self, data):
+        return np.flatnonzero(data.arrays.edge_creases > 0.0)
 
-        if "crease_edge" in data.obj.data.attributes:
-            edge_count = sum(1 for d in data.obj.data.attributes["crease_edge"].data if d.value > 0.0)
-        is_error = edge_count > 0
-        return RuleResult(self.rule, is_error, data.obj, "Object '{}' contains {} edges with creases set".format(data.obj.name, edge_count))
+    def report(self, obj, edges):
+        return self.report_elements(obj, 'EDGE', edges, "Object '{}' contains {} edges with creases set")
 
 
+@rule_registry.register
 class OrientationTransformRule(BaseObjectRule):
     rule = Rule('Orientation', 'Unapplied transforms')
 
@@ -208,6 +435,7 @@ class OrientationTransformRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, "Object '{}' has unapplied rotation or scale".format(data.obj.name))
 
 
+@rule_registry.register
 class MaterialRule(BaseObjectRule):
     rule = Rule('Material', 'Material missing')
 
@@ -216,6 +444,7 @@ class MaterialRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, "Object '{}' does not have an assigned material".format(data.obj.name))
 
 
+@rule_registry.register
 class MaterialNameRule(BaseObjectRule):
     rule = Rule('Material', 'Material name')
 
@@ -230,6 +459,7 @@ class MaterialNameRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, message)
 
 
+@rule_registry.register
 class MaterialUVRule(BaseObjectRule):
     rule = Rule('Material', 'UVs missing')
 
@@ -238,156 +468,1086 @@ class MaterialUVRule(BaseObjectRule):
         return RuleResult(self.rule, is_error, data.obj, "Object '{}' is missing UVs".format(data.obj.name))
 
 
+@rule_registry.register
 class AllMeshRule(BaseCollectionRule):
     rule = Rule('Organization', 'Mesh Collection')
 
     def execute(self, data):
         number_non_mesh = sum(1 for obj in data.collection.all_objects if obj.type != 'MESH')
         is_error = number_non_mesh > 0
-        return RuleResult(self.rule, is_error, None, "Collection '{}' contains {} non-mesh objects".format(data.collection.name, number_non_mesh))
+        return [RuleResult(self.rule, is_error, None, "Collection '{}' contains {} non-mesh objects".format(data.collection.name, number_non_mesh))]
+
+
+@rule_registry.register
+class CollectionCoincidentVertRule(BaseCollectionRule):
+    rule = Rule('Geometry', 'Coincident objects')
+    Cost = 'EXPENSIVE'
+
+    def world_positions(self, obj, mesh_positions):
+        positions = mesh_positions.get(obj.data.session_uid)
+        if positions is None:
+            positions = mesh_positions[obj.data.session_uid] = ma.MeshArrays(obj.data).positions
+
+        matrix = np.array(obj.matrix_world, dtype=np.float32)
+        return positions @ matrix[:3, :3].T + matrix[:3, 3]
+
+    def execute(self, data):
+        if not data.settings.use_cross_object_coincident:
+            return [RuleResult(self.rule, False, None, "Cross-object check disabled")]
+
+        objs = dc.get_objects(data.collection.all_objects, {'MESH'})
+        mesh_positions = {}
+        positions = [self.world_positions(obj, mesh_positions) for obj in objs]
+        owners = [np.full(len(p), i, dtype=np.int32) for i, p in enumerate(positions)]
+        if len(positions) < 2:
+            return [RuleResult(self.rule, False, None, "Fewer than 2 mesh objects")]
+
+        owner_a, owner_b, counts = ma.find_coincident_owner_pairs(np.concatenate(positions), np.concatenate(owners), data.settings.coincident_distance)
+        if len(counts) == 0:
+            return [RuleResult(self.rule, False, None, "No coincident vertices between objects")]
+
+        results = []
+        for a, b, count in zip(owner_a, owner_b, counts):
+            message = "Objects '{}' and '{}' share {} coincident vertices".format(objs[a].name, objs[b].name, count)
+            results.append(RuleResult(self.rule, True, objs[a], message))
+
+        return results
+
+
+@rule_registry.register
+class CollectionInterpenetrationRule(BaseCollectionRule):
+    rule = Rule('Geometry', 'Interpenetrating objects')
+    Cost = 'EXPENSIVE'
+
+    def world_bounds(self, objs):
+        corners = np.array([obj.bound_box for obj in objs], dtype=np.float64).reshape(-1, 8, 3)
+        matrices = np.array([obj.matrix_world for obj in objs], dtype=np.float64).reshape(-1, 4, 4)
+        world = np.einsum('nij,nkj->nki', matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+        return world.min(axis=1), world.max(axis=1)
+
+    def world_bvh(self, obj):
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        bm.transform(obj.matrix_world)
+        bvh = BVHTree.FromBMesh(bm)
+        bm.free()
+        return bvh
+
+    def execute(self, data):
+        if not data.settings.use_interpenetration:
+            return [RuleResult(self.rule, False, None, "Interpenetration check disabled")]
+
+        objs = [obj for obj in dc.get_objects(data.collection.all_objects, {'MESH'}) if len(obj.data.polygons) > 0]
+        if len(objs) < 2:
+            return [RuleResult(self.rule, False, None, "Fewer than 2 mesh objects")]
+
+        # Only objects whose world bounds overlap are tested face against face; trees are built once per object
+        mins, maxs = self.world_bounds(objs)
+        pairs_a, pairs_b = ma.sweep_and_prune(mins, maxs)
+        trees = {}
+        results = []
+        for a, b in zip(pairs_a.tolist(), pairs_b.tolist()):
+            for i in (a, b):
+                if i not in trees:
+                    trees[i] = self.world_bvh(objs[i])
 
+            overlaps = trees[a].overlap(trees[b])
+            if overlaps:
+                faces = np.unique(np.array(overlaps, dtype=np.int32)[:, 0])
+                message = "Objects '{}' and '{}' interpenetrate at {} faces".format(objs[a].name, objs[b].name, faces.size)
+                results.append(RuleResult(self.rule, True, objs[a], message, ElementSet('FACE', faces)))
 
-class MaterialUVOverlapRule(BaseCollectionRule):
+        if not results:
+            results.append(RuleResult(self.rule, False, None, "No interpenetrating objects"))
+
+        return results
+
+
+@rule_registry.register
+class MaterialUVOverlapRule(BaseMeshRule):
     rule = Rule('Material', 'UVs overlap')
+    Cost = 'EXPENSIVE'
+
+    def measure(self, data):
+        if data.arrays.uvs is None:
+            return None
+
+        # Triangles of the same face may touch but are never counted against each other
+        faces = data.arrays.loop_triangle_faces
+        overlapped = ma.find_overlapping_triangles(data.arrays.uv_triangles, faces)
+        return np.unique(faces[overlapped]).size
+
+    def report(self, obj, overlap_count):
+        if overlap_count is None:
+            return RuleResult(self.rule, False, obj, "No UVs found")
+
+        is_error = overlap_count > 0
+        return RuleResult(self.rule, is_error, obj, "Object '{}' has {} faces with overlapping UVs".format(obj.name, overlap_count))
+
+
+@rule_registry.register
+class CollectionUVOverlapRule(BaseCollectionRule):
+    rule = Rule('Material', 'UVs overlap across objects')
+    Cost = 'EXPENSIVE'
+
+    def execute(self, data):
+        if not data.settings.use_collection_uv_overlap:
+            return [RuleResult(self.rule, False, None, "Collection UV overlap check disabled")]
+
+        # Objects sharing a mesh share their UVs by design, so each mesh only takes part once
+        mesh_users = defaultdict(list)
+        for obj in dc.get_objects(data.collection.all_objects, {'MESH'}):
+            if len(obj.data.uv_layers) > 0:
+                mesh_users[obj.data.session_uid].append(obj)
+
+        users = list(mesh_users.values())
+        if len(users) < 2:
+            return [RuleResult(self.rule, False, None, "Fewer than 2 meshes with UVs")]
+
+        tris, owners, faces = [], [], []
+        for i, objs in enumerate(users):
+            arrays = ma.MeshArrays(objs[0].data)
+            tris.append(arrays.uv_triangles)
+            owners.append(np.full(len(arrays.uv_triangles), i, dtype=np.int64))
+            faces.append(arrays.loop_triangle_faces.astype(np.int64))
+
+        owners = np.concatenate(owners)
+        faces = np.concatenate(faces)
+        overlapped = ma.find_overlapping_triangles(np.concatenate(tris), owners)
+
+        # Count distinct faces per mesh which overlap a face of some other mesh
+        stride = int(faces.max()) + 1 if len(faces) else 1
+        overlapped = np.unique(owners[overlapped] * stride + faces[overlapped])
+        counts = np.bincount(overlapped // stride, minlength=len(users))
+
+        results = []
+        for objs, count in zip(users, counts):
+            if count > 0:
+                for obj in objs:
+                    message = "Object '{}' has {} faces with UVs overlapping other objects".format(obj.name, count)
+                    results.append(RuleResult(self.rule, True, obj, message))
+
+        if not results:
+            results.append(RuleResult(self.rule, False, None, "No UVs overlap across objects"))
+
+        return results
+
+
+@rule_registry.register
+class MaterialUVStretchRule(BaseMeshRule):
+    rule = Rule('Material', 'UVs stretched')
+    Cost = 'MODERATE'
+    Sample_Domain = 'FACE'
+    Sample_Label = "faces with stretched UVs"
+
+    def measure(self, data):
+        if data.arrays.uvs is None:
+            return None
+
+        return ma.stretched_uv_faces(data.arrays, data.settings.max_uv_area_stretch, data.settings.max_uv_angle_distortion)
+
+    def measure_sample(self, data, indices):
+        # Each face's share of the layout is still taken against the whole mesh
+        if data.arrays.uvs is None:
+            return np.zeros(len(indices), dtype=bool)
+
+        return ma.uv_stretch_mask(data.arrays, indices, data.settings.max_uv_area_stretch, data.settings.max_uv_angle_distortion, data.uv_area_totals)
+
+    def report_estimate(self, obj, estimate):
+        if len(obj.data.uv_layers) == 0:
+            return self.report(obj, None)
+
+        return super().report_estimate(obj, estimate)
+
+    def report(self, obj, faces):
+        if faces is None:
+            return RuleResult(self.rule, False, obj, "No UVs found")
+
+        return self.report_elements(obj, 'FACE', faces, "Object '{}' has {} faces with stretched UVs")
+
+
+@rule_registry.register
+class CollectionTexelDensityRule(BaseCollectionRule):
+    rule = Rule('Material', 'Texel density')
+    Cost = 'MODERATE'
 
     def execute(self, data):
-        return RuleResult(self.rule, False, None, "")
-        # if len(data.obj.data.uv_layers) > 0:
-        #     self.ready_selection('FACE')
-        #     bpy.ops.uv.select_overlapping(extend=False)
-        #     overlap_count = sum(1 for f in data.bm.faces if f.select)
-        #     is_error = overlap_count > 0
-        #     message = "Object '{}' has {} overlapping UVs".format(data.obj.name, overlap_count)
-        # else:
-        #     is_error = False
-        #     message = 'No UVs found'
-        # return RuleResult(self.rule, is_error, None, message)
+        if not data.settings.use_texel_density:
+            return [RuleResult(self.rule, False, None, "Texel density check disabled")]
+
+        # Density is measured once per mesh, then scaled by each object's transform
+        mesh_density = {}
+        objs, densities = [], []
+        for obj in dc.get_objects(data.collection.all_objects, {'MESH'}):
+            if len(obj.data.uv_layers) == 0:
+                continue
+            if obj.data.session_uid not in mesh_density:
+                mesh_density[obj.data.session_uid] = ma.texel_density(ma.MeshArrays(obj.data))
+            density = mesh_density[obj.data.session_uid]
+            scale = abs(np.linalg.det(np.array(obj.matrix_world.to_3x3()))) ** (1 / 3)
+            if density is not None and scale > 0.0:
+                objs.append(obj)
+                densities.append(density / scale)
+
+        if len(objs) < 2:
+            return [RuleResult(self.rule, False, None, "Fewer than 2 objects with UVs")]
+
+        densities = np.array(densities)
+        median = np.median(densities)
+        factors = densities / median
+        tolerance = data.settings.texel_density_tolerance
+        results = []
+        for i in np.flatnonzero((factors > tolerance) | (factors * tolerance < 1.0)).tolist():
+            message = "Object '{}' has {:.2f}x the median texel density of the collection".format(objs[i].name, factors[i])
+            results.append(RuleResult(self.rule, True, objs[i], message))
+
+        if not results:
+            results.append(RuleResult(self.rule, False, None, "Texel density is consistent"))
+
+        return results
+
 
 #
 # Analyzer Processing
 #
 
 
-class ObjectModeAnalyzer:
-    Rules = [
-        ObjectNameRule(),
-        ObjectDataNameRule(),
-        TopologySubDivCreaseRule(),
-        OrientationTransformRule(),
-        MaterialRule(),
-        MaterialNameRule(),
-        MaterialUVRule(),
-    ]
+class ValidationTimings:
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    @contextmanager
+    def measure(self, kind, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(kind, name, time.perf_counter() - start)
+
+    def add(self, kind, name, seconds, count=1):
+        self.seconds[(kind, name)] += seconds
+        self.counts[(kind, name)] += count
+
+    def items(self):
+        # (kind, name, seconds, count) with the slowest first
+        items = [(kind, name, seconds, self.counts[(kind, name)]) for (kind, name), seconds in self.seconds.items()]
+        return sorted(items, key=lambda item: item[2], reverse=True)
+
+
+def measure_time(timings, kind, key):
+    if timings is None:
+        return nullcontext()
 
-    def __init__(self, obj):
-        self.rule_data = ObjectRuleData(obj, None)
+    name = "{}: {}".format(key.category, key.label) if isinstance(key, Rule) else key
+    return timings.measure(kind, name)
+
+
+class ObjectModeAnalyzer:
+    def __init__(self, obj, timings=None, max_cost='EXPENSIVE', stop_at_first_error=False):
+        self.rule_data = ObjectRuleData(obj)
+        self.timings = timings
+        self.rules = rule_registry.schedule('OBJECT', max_cost)
+        self.stop_at_first_error = stop_at_first_error
 
     def find_problems(self):
         analysis = []
-        for rule in ObjectModeAnalyzer.Rules:
-            result = rule.execute(self.rule_data)
+        for rule in self.rules:
+            with measure_time(self.timings, 'RULE', rule.rule):
+                result = rule.execute(self.rule_data)
             analysis.append(result)
+            if result.is_error and self.stop_at_first_error:
+                break
 
         return analysis
 
 
-class EditModeAnalyzer:
-    Rules = [
-        GeometryIsolatedVertRule(),
-        GeometryCoincidentVertRule(),
-        GeometryInteriorFaceRule(),
-        GeometryNonManifoldRule(),
-        GeometryDistortionRule(),
-        TopologyNGonRule(),
-        TopologyLargeNGonRule(),
-        TopologyPoleRule(),
-    ]
-
-    def __init__(self, obj):
-        self.rule_data = ObjectRuleData(obj, bmesh.from_edit_mesh(obj.data))
-        self.rule_data.bm.select_mode = {'VERT', 'EDGE', 'FACE'}
-
-    def find_problems(self):
+class MeshAnalyzer:
+    # Bump whenever a mesh rule changes what it measures; stale entries of the disk cache are then never looked up again
+    Rules_Version = 3
+
+    # Sampled rules start with this many elements and double the sample until their share of the time budget is spent
+    Sample_Chunk = 16384
+
+    def __init__(self, mesh, settings, arrays=None, timings=None, disk_cache=None, approximate=False, max_cost='EXPENSIVE'):
+        self.mesh = mesh
+        self.settings = settings
+        self.arrays = arrays if arrays is not None else ma.MeshArrays(mesh)
+        self.rule_data = MeshRuleData(mesh, self.arrays, settings, timings)
+        self.measurements = None
+        self.timings = timings
+        self.disk_cache = disk_cache
+        self.disk_key = None
+        self.approximate = approximate and self.arrays.face_count >= settings.approximate_min_faces
+
+        self.rules = rule_registry.schedule('MESH', max_cost)
+        self.skipped_rules = []
+        if self.approximate:
+            # Cheap and bounded rules stay exact; costlier ones are sampled where they can be and skipped otherwise
+            self.skipped_rules = [rule for rule in self.rules if rule.Sample_Domain is None and rule.Cost != 'CHEAP' and not rule.Bounded]
+            self.rules = [rule for rule in self.rules if rule not in self.skipped_rules]
+        # The mesh's time budget is shared by the sampled rules
+        self.sampled_count = sum(1 for rule in self.rules if self.approximate and rule.Sample_Domain is not None)
+
+    def disk_cache_key(self):
+        key = (self.arrays.content_hash, MeshAnalyzer.Rules_Version, [rule.rule for rule in self.rules], self.settings.cache_key())
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def lookup_disk_cache(self):
+        # Estimates depend on the time budget, so only exact measurements go to the disk cache
+        if self.approximate or self.disk_cache is None:
+            return {}
+
+        with measure_time(self.timings, 'PHASE', 'Disk cache'):
+            self.disk_key = self.disk_cache_key()
+            values = self.disk_cache.lookup(self.disk_key)
+        return dict(zip(self.rules, values)) if values is not None else {}
+
+    def measure(self, rule):
+        # Each rule is measured once per mesh, when the first object using the mesh needs it
+        if self.measurements is None:
+            self.measurements = self.lookup_disk_cache()
+
+        if rule not in self.measurements:
+            with measure_time(self.timings, 'RULE', rule.rule):
+                if self.approximate and rule.Sample_Domain is not None:
+                    self.measurements[rule] = self.estimate(rule, self.settings.approximate_time_budget / self.sampled_count)
+                else:
+                    self.measurements[rule] = rule.measure(self.rule_data)
+
+            # Only complete sets of measurements are worth keeping
+            if self.disk_key is not None and len(self.measurements) == len(self.rules):
+                self.disk_cache.store(self.disk_key, [self.measurements[rule] for rule in self.rules])
+
+        return self.measurements[rule]
+
+    def estimate(self, rule, budget):
+        total = {'VERT': self.arrays.vert_count, 'EDGE': self.arrays.edge_count, 'FACE': self.arrays.face_count}[rule.Sample_Domain]
+        deadline = time.perf_counter() + budget
+        found = []
+        sampled = 0
+        chunk = self.Sample_Chunk
+        while sampled < total:
+            indices = ma.stratified_indices(total, sampled, min(total, sampled + chunk))
+            found.append(indices[rule.measure_sample(self.rule_data, indices)])
+            sampled += len(indices)
+            chunk *= 2
+            if time.perf_counter() > deadline:
+                break
+
+        indices = np.sort(np.concatenate(found)).astype(np.int32) if found else np.empty(0, dtype=np.int32)
+        return Estimate(indices, sampled, total)
+
+    def find_problems(self, obj):
+        # Measure once, then report for each object which uses this mesh
         analysis = []
-        for rule in EditModeAnalyzer.Rules:
-            result = rule.execute(self.rule_data)
+        for rule in self.rules:
+            value = self.measure(rule)
+            result = rule.report_estimate(obj, value) if isinstance(value, Estimate) else rule.report(obj, value)
             analysis.append(result)
 
+            # Costlier rules are left unmeasured, unless another object using the mesh gets that far
+            if result.is_error and self.settings.stop_at_first_error:
+                break
+
+        # Rules left out in approximate mode are reported so the object is not mistaken for clean
+        for rule in self.skipped_rules:
+            analysis.append(RuleResult(rule.rule, False, obj, "Object '{}' was not checked in approximate mode".format(obj.name), skipped=True))
+
         return analysis
 
+    def free(self):
+        self.rule_data.free()
 
-class CollectionAnalyzer:
-    Rules = [
-        AllMeshRule(),
-        MaterialUVOverlapRule()
-    ]
 
-    def __init__(self, collection):
-        self.rule_data = CollectionRuleData(collection)
+class CollectionAnalyzer:
+    def __init__(self, collection, settings, timings=None):
+        self.rule_data = CollectionRuleData(collection, settings)
+        self.timings = timings
+        self.rules = rule_registry.schedule('COLLECTION', collection_max_cost(collection))
 
     def find_problems(self):
         analysis = []
-        for rule in CollectionAnalyzer.Rules:
-            result = rule.execute(self.rule_data)
-            analysis.append(result)
+        for rule in self.rules:
+            with measure_time(self.timings, 'RULE', rule.rule):
+                results = rule.execute(self.rule_data)
+            analysis += results
 
         return analysis
 
 
+#
+# Result storage
+#
+
+
+class ResultStore:
+    # Findings are kept in flat arrays; only the visible page is copied into the scene's CollectionProperty
+    Page_Size = 100
+
+    # Every change takes a new version, unique across stores, so views of the findings know when to rebuild
+    Versions = itertools.count()
+
+    def __init__(self):
+        self.version = next(ResultStore.Versions)
+        self.rules = []
+        self.rule_lookup = {}
+        self.obj_names = []
+        self.obj_lookup = {}
+        self.rule_indices = array('i')
+        self.obj_indices = array('i')
+        self.details = []
+        # Element indices stay as compact arrays here, keyed by finding; RNA only ever sees the visible page
+        self.elements = {}
+        self.estimated = set()
+        # Objects with rules skipped in approximate mode; not findings, but followed up like estimated ones
+        self.unchecked = set()
+        # (version, ranks) of the last sort_keys; ranks only change with the findings, not with every redraw
+        self.rank_cache = None
+        # Full timings of the run, per object too; RNA only gets the phases, rules and slowest objects
+        self.timings = None
+        # Reports spanning several collections: each object's collections, and the collection of each collection rule finding
+        self.collection_names = []
+        self.membership = {}
+        self.finding_collections = {}
+
+    def clear(self):
+        self.__init__()
+
+    def __len__(self):
+        return len(self.details)
+
+    def set_collections(self, collections):
+        self.collection_names = [collection.name for collection in collections]
+        self.membership = defaultdict(list)
+        for collection_index, collection in enumerate(collections):
+            for obj in dc.get_objects(collection.all_objects, {'MESH'}):
+                self.membership[obj.name].append(collection_index)
+
+    def add(self, results, collection_index=None):
+        self.version = next(ResultStore.Versions)
+        for result in results:
+            if result.skipped:
+                self.unchecked.add(result.obj.name)
+                continue
+
+            rule_index = self.rule_lookup.get(result.rule)
+            if rule_index is None:
+                rule_index = self.rule_lookup[result.rule] = len(self.rules)
+                self.rules.append(result.rule)
+
+            obj_index = -1
+            if result.obj is not None:
+                obj_index = self.obj_lookup.get(result.obj.name)
+                if obj_index is None:
+                    obj_index = self.obj_lookup[result.obj.name] = len(self.obj_names)
+                    self.obj_names.append(result.obj.name)
+
+            if result.elements is not None:
+                self.elements[len(self.details)] = result.elements
+            if result.estimated:
+                self.estimated.add(len(self.details))
+            if collection_index is not None:
+                self.finding_collections[len(self.details)] = collection_index
+            self.rule_indices.append(rule_index)
+            self.obj_indices.append(obj_index)
+            self.details.append(result.detail)
+
+    def remove(self, indices):
+        # Drop the given findings; the others keep their order
+        self.version = next(ResultStore.Versions)
+        keep = np.ones(len(self), dtype=bool)
+        keep[np.asarray(indices, dtype=np.int64)] = False
+        kept = np.flatnonzero(keep)
+        new_index = np.cumsum(keep) - 1
+
+        self.rule_indices = array('i', np.frombuffer(self.rule_indices, dtype=np.int32)[kept].tolist())
+        self.obj_indices = array('i', np.frombuffer(self.obj_indices, dtype=np.int32)[kept].tolist())
+        self.details = [self.details[i] for i in kept.tolist()]
+        self.elements = {int(new_index[i]): elements for i, elements in self.elements.items() if keep[i]}
+        self.estimated = {int(new_index[i]) for i in self.estimated if keep[i]}
+        self.finding_collections = {int(new_index[i]): collection_index for i, collection_index in self.finding_collections.items() if keep[i]}
+
+    def forget_elements(self, obj_names):
+        # The elements of these objects' findings were renumbered; the findings stay but can no longer select anything
+        self.version = next(ResultStore.Versions)
+        objs = [self.obj_lookup[name] for name in obj_names if name in self.obj_lookup]
+        stale = set(np.flatnonzero(np.isin(np.frombuffer(self.obj_indices, dtype=np.int32), objs)).tolist())
+        self.elements = {index: elements for index, elements in self.elements.items() if index not in stale}
+
+    def replace(self, obj_names, results, removed_names=()):
+        # Drop the object and mesh rule findings of these objects, then add their new ones; collection rule findings were not re-run and stay
+        # Objects which no longer exist lose all of their findings
+        self.unchecked.difference_update(obj_names)
+        self.unchecked.difference_update(removed_names)
+        drop = [self.obj_lookup[name] for name in obj_names if name in self.obj_lookup]
+        removed = [self.obj_lookup[name] for name in removed_names if name in self.obj_lookup]
+        if drop or removed:
+            obj_indices = np.frombuffer(self.obj_indices, dtype=np.int32)
+            collection_rules = [index for index, rule in enumerate(self.rules) if rule_registry.scopes.get(rule) == 'COLLECTION']
+            mask = np.isin(obj_indices, drop) & ~np.isin(np.frombuffer(self.rule_indices, dtype=np.int32), collection_rules)
+            mask |= np.isin(obj_indices, removed)
+            self.remove(np.flatnonzero(mask))
+
+        self.add(results)
+
+    def estimated_objects(self):
+        return {self.obj_names[self.obj_indices[i]] for i in self.estimated if self.obj_indices[i] >= 0} | self.unchecked
+
+    def collections_of(self, index):
+        collection_index = self.finding_collections.get(index)
+        if collection_index is not None:
+            return [self.collection_names[collection_index]]
+
+        obj_index = self.obj_indices[index]
+        if obj_index < 0:
+            return []
+        return [self.collection_names[i] for i in self.membership.get(self.obj_names[obj_index], ())]
+
+    def collection_counts(self):
+        # Object findings count towards every validated collection holding the object, collection rule findings only towards their own
+        counts = np.zeros(len(self.collection_names), dtype=np.int64)
+        obj_indices = np.frombuffer(self.obj_indices, dtype=np.int32)
+        tagged = np.zeros(len(self), dtype=bool)
+        tagged[np.fromiter(self.finding_collections.keys(), dtype=np.int64, count=len(self.finding_collections))] = True
+
+        per_obj = np.bincount(obj_indices[~tagged & (obj_indices >= 0)], minlength=len(self.obj_names))
+        for obj_index in np.flatnonzero(per_obj).tolist():
+            for collection_index in self.membership.get(self.obj_names[obj_index], ()):
+                counts[collection_index] += per_obj[obj_index]
+
+        np.add.at(counts, np.fromiter(self.finding_collections.values(), dtype=np.int64, count=len(self.finding_collections)), 1)
+        return counts
+
+    def rule_counts(self):
+        return np.bincount(np.frombuffer(self.rule_indices, dtype=np.int32), minlength=len(self.rules))
+
+    def ranks(self):
+        # Rank of each rule by category, of each rule by category and label, and of each object by name; the last slot is for no object
+        if self.rank_cache is None or self.rank_cache[0] != self.version:
+            category_order = sorted(range(len(self.rules)), key=lambda i: self.rules[i].category)
+            label_order = sorted(range(len(self.rules)), key=lambda i: (self.rules[i].category, self.rules[i].label))
+            obj_order = np.argsort(np.array(self.obj_names, dtype=object), kind='stable') if self.obj_names else np.empty(0, dtype=np.int64)
+
+            category_rank = np.empty(len(self.rules), dtype=np.int32)
+            category_rank[category_order] = np.arange(len(self.rules))
+            rule_rank = np.empty(len(self.rules), dtype=np.int32)
+            rule_rank[label_order] = np.arange(len(self.rules))
+            obj_rank = np.empty(len(self.obj_names) + 1, dtype=np.int32)
+            obj_rank[obj_order] = np.arange(len(self.obj_names))
+            obj_rank[-1] = -1
+            self.rank_cache = (self.version, (category_rank, rule_rank, obj_rank))
+
+        return self.rank_cache[1]
+
+    def sort_keys(self, sort_by, indices):
+        # Per-finding (primary, secondary, tertiary) ranks; collection level findings sort before any object
+        rule_indices = np.frombuffer(self.rule_indices, dtype=np.int32)[indices]
+        obj_indices = np.frombuffer(self.obj_indices, dtype=np.int32)[indices]
+        category_rank, rule_rank, obj_rank = self.ranks()
+
+        categories = category_rank[rule_indices]
+        rules = rule_rank[rule_indices]
+        objs = obj_rank[obj_indices]
+        if sort_by == 'CATEGORY':
+            return (categories, rules, objs)
+        if sort_by == 'RULE':
+            return (rules, objs, categories)
+        if sort_by == 'OBJECT':
+            return (objs, rules, categories)
+        return (np.asarray(indices),)
+
+    def make_view(self, rule_index, sort_by, filter_text=""):
+        # Indices of the findings to show, in display order; the text filter covers every finding, before paging
+        indices = np.arange(len(self))
+        if rule_index >= 0:
+            indices = indices[np.frombuffer(self.rule_indices, dtype=np.int32) == rule_index]
+        if filter_text:
+            match = re.compile(fnmatch.translate("*{}*".format(filter_text.lower()))).match
+            details = self.details
+            keep = np.fromiter((match(details[i].lower()) is not None for i in indices.tolist()), dtype=bool, count=len(indices))
+            indices = indices[keep]
+
+        keys = self.sort_keys(sort_by, indices)
+        return indices[np.lexsort(keys[::-1])]
+
+
+result_stores = {}
+
+
+def get_result_store(scene):
+    store = result_stores.get(scene.session_uid)
+    if store is None:
+        store = result_stores[scene.session_uid] = ResultStore()
+    return store
+
+
+#
+# Result caching
+#
+
+CacheEntry = namedtuple('CacheEntry', ['fingerprint', 'mesh_uid', 'content_hash', 'max_cost', 'results'])
+
+
+class ValidationCache:
+    def __init__(self):
+        self.entries = {}
+        self.dirty = set()
+        self.refreshed = set()
+        self.arrays = {}
+        self.settings_key = None
+
+    def use_settings(self, settings):
+        # Results computed with different thresholds are not comparable
+        settings_key = settings.cache_key()
+        if settings_key != self.settings_key:
+            self.entries.clear()
+            self.settings_key = settings_key
+
+    def clear(self):
+        self.entries.clear()
+        self.dirty.clear()
+        self.refreshed.clear()
+        self.arrays.clear()
+
+    def mark_dirty(self, id_data):
+        self.dirty.add(id_data.session_uid)
+
+    def fingerprint(self, obj):
+        # Everything the rules read which can change without a geometry update
+        mesh = obj.data
+        material = obj.active_material
+        return (obj.name, mesh.name, mesh.users,
+                tuple(obj.scale), tuple(obj.rotation_euler),
+                # Wall thickness is judged through the world transform, parents included
+                tuple(value for row in obj.matrix_world for value in row),
+                material.name if material else None,
+                len(mesh.uv_layers),
+                len(mesh.vertices), len(mesh.edges), len(mesh.polygons), len(mesh.loops))
+
+    def get_arrays(self, mesh):
+        # Arrays are shared between the content hash and the mesh rules for the current run
+        if mesh.session_uid not in self.arrays:
+            self.arrays[mesh.session_uid] = ma.MeshArrays(mesh)
+        return self.arrays[mesh.session_uid]
+
+    def lookup(self, obj, max_cost='EXPENSIVE'):
+        entry = self.entries.get(obj.session_uid)
+        if entry is None or entry.max_cost != max_cost or entry.fingerprint != self.fingerprint(obj):
+            return None
+
+        # Only hash content for objects which reported a geometry update since they were cached
+        if obj.session_uid in self.dirty or entry.mesh_uid in self.dirty:
+            if entry.mesh_uid != obj.data.session_uid or entry.content_hash != self.get_arrays(obj.data).content_hash:
+                return None
+
+        self.refreshed.add(obj.session_uid)
+        return [result._replace(obj=obj) for result in entry.results]
+
+    def store(self, obj, results, max_cost='EXPENSIVE'):
+        mesh_uid = obj.data.session_uid
+        self.entries[obj.session_uid] = CacheEntry(self.fingerprint(obj), mesh_uid, self.get_arrays(obj.data).content_hash, max_cost, results)
+        self.refreshed.add(obj.session_uid)
+
+    def commit(self):
+        # Entries which were not verified this run can no longer trust the dirty flags being cleared
+        for uid in list(self.entries.keys()):
+            entry = self.entries[uid]
+            if uid not in self.refreshed and (uid in self.dirty or entry.mesh_uid in self.dirty):
+                del self.entries[uid]
+
+        self.dirty.clear()
+        self.refreshed.clear()
+        self.arrays.clear()
+
+
+validation_cache = ValidationCache()
+
+
+#
+# Watch mode: objects changed while modeling are re-validated once edits pause
+#
+
+def get_report_collections(scene):
+    # The collection the current report is named after, and the collections it validated
+    collection_name = scene.dc_validation_data.collection_name
+    if collection_name == scene.collection.name:
+        collection = scene.collection
+    else:
+        collection = bpy.data.collections.get(collection_name)
+
+    store = get_result_store(scene)
+    if not store.collection_names:
+        return collection, [collection] if collection is not None else []
+
+    collections = [scene.collection if name == scene.collection.name else bpy.data.collections.get(name) for name in store.collection_names]
+    return collection, [collection for collection in collections if collection is not None]
+
+
+def collection_objects(collections):
+    # Objects linked into several of the collections are only returned once
+    objs = {}
+    for collection in collections:
+        for obj in dc.get_objects(collection.all_objects, {'MESH'}):
+            objs.setdefault(obj.name_full, obj)
+    return list(objs.values())
+
+
+def collection_max_cost(collection):
+    return RuleRegistry.Profiles[collection.dc_validation_profile]
+
+
+def object_max_costs(collections):
+    # Objects in several collections run the rules of the most thorough profile among them
+    max_costs = {}
+    for collection in collections:
+        max_cost = collection_max_cost(collection)
+        for obj in dc.get_objects(collection.all_objects, {'MESH'}):
+            current = max_costs.get(obj.name_full)
+            if current is None or RuleRegistry.Costs.index(max_cost) > RuleRegistry.Costs.index(current):
+                max_costs[obj.name_full] = max_cost
+    return max_costs
+
+
+watch_state = {
+    "changed": set(),
+    "last_change": 0.0,
+}
+
+
+def watch_timer():
+    context = bpy.context
+    settings = context.scene.dc_validation_settings
+    if not settings.use_watch:
+        watch_state["changed"].clear()
+        return None
+
+    # Debounce: wait until no change arrived for the whole delay; a full validation in progress covers everything anyway
+    remaining = watch_state["last_change"] + settings.watch_delay - time.monotonic()
+    if remaining > 0:
+        return remaining
+    if validation_state["validator"] is not None:
+        return settings.watch_delay
+
+    changed = watch_state["changed"]
+    watch_state["changed"] = set()
+
+    # Only the collection of the current report is watched; a report loaded from the file needs a full run first
+    validation_data = context.scene.dc_validation_data
+    store = get_result_store(context.scene)
+    if validation_data.collection_name == '' or (len(store) == 0 and validation_data.result_count > 0):
+        return None
+    collection, collections = get_report_collections(context.scene)
+    if collection is None:
+        return None
+
+    # Objects being edited are picked up again by the update sent when they leave edit mode
+    objs = [obj for obj in collection_objects(collections)
+            if (obj.session_uid in changed or obj.data.session_uid in changed) and obj.mode != 'EDIT']
+    # Names of removed objects which still have findings
+    listed = np.unique(np.frombuffer(store.obj_indices, dtype=np.int32)).tolist()
+    stale_names = [store.obj_names[i] for i in listed if i >= 0 and store.obj_names[i] not in bpy.data.objects]
+    if not objs and not stale_names:
+        return None
+
+    Validator(collection, settings, validation_cache, collections=collections).revalidate(context, objs, stale_names)
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+    return None
+
+
+@persistent
+def depsgraph_update_handler(scene, depsgraph):
+    # Runs after every update, so it only records IDs; all real work happens later from the cache or the watch timer
+    watching = scene.dc_validation_settings.use_watch
+    if not validation_cache.entries and not watching:
+        return
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Object, bpy.types.Mesh)):
+            if update.is_updated_geometry:
+                validation_cache.mark_dirty(update.id.original)
+            if watching and (update.is_updated_geometry or update.is_updated_transform):
+                watch_state["changed"].add(update.id.original.session_uid)
+
+    if watching and watch_state["changed"]:
+        watch_state["last_change"] = time.monotonic()
+        if not bpy.app.timers.is_registered(watch_timer):
+            bpy.app.timers.register(watch_timer, first_interval=scene.dc_validation_settings.watch_delay)
+
+
+@persistent
+def load_handler(filepath):
+    validation_cache.clear()
+    result_stores.clear()
+    watch_state["changed"].clear()
+    # A run of the previous file ends with it; its modal operator is cancelled along with the file
+    validation_state["validator"] = None
+
+
+def shard_objects(objs, index, count):
+    # Split by mesh so shared meshes are measured by one shard only; the largest meshes are handed out first
+    # Every process computes the same split from the same file, so no coordination is needed
+    mesh_users = defaultdict(list)
+    for obj in objs:
+        mesh_users[obj.data.name_full].append(obj)
+
+    def cost(name):
+        return len(mesh_users[name][0].data.loops) + len(mesh_users[name])
+
+    loads = [0] * count
+    shard = []
+    for name in sorted(mesh_users.keys(), key=lambda name: (-cost(name), name)):
+        target = loads.index(min(loads))
+        loads[target] += cost(name)
+        if target == index:
+            shard += mesh_users[name]
+
+    return shard
+
+
 class Validator:
-    def __init__(self, collection):
+    def __init__(self, collection, settings, cache=None, shard=None, exact_objects=None, collections=None):
+        # The report is named after collection; collections, when given, are validated together with each object checked once
         self.collection = collection
+        self.collections = collections or [collection]
+        self.settings = settings
+        self.cache = cache
+        self.shard = shard
+        # Names of objects measured exactly even in approximate mode, e.g. to follow up on estimated findings
+        self.exact_objects = exact_objects or set()
+        # Most expensive rule cost class per object, from the rule profiles of its collections
+        self.max_costs = {}
+        self.disk_cache = None
+        self.disk_counts = Counter()
+        # Measurements of evaluated meshes by content, shared by objects whose modifiers give the same result
+        self.evaluated_measurements = {}
+        self.depsgraph = None
         self.results = defaultdict(list)
+        # Rules left out in approximate mode, by object; reported apart from the findings
+        self.skipped = []
+        self.pending = []
+        self.timings = ValidationTimings()
+        self.objs_to_check = []
+        self.checked_count = 0
+        self.validation_data = None
+        self.store = None
+        self.run_start = 0
 
     def run(self, context):
+        self.begin(context)
+        for _ in self.examine_objects(self.objs_to_check):
+            pass
+        self.finish()
+
+    def begin(self, context):
+        self.prepare(context)
+
+        # Collection-wide rules look at every object and only run once, in the first shard
+        if self.shard is None or self.shard[0] == 0:
+            self.examine_collection()
+
+    def prepare(self, context):
         print("--------------------------------")
 
+        self.start_run(context)
+
+        # Flush any pending edit-mode changes; analysis itself never leaves object mode
+        if context.mode != 'OBJECT':
+            if self.cache is not None:
+                for obj in context.objects_in_mode:
+                    self.cache.mark_dirty(obj)
+                    self.cache.mark_dirty(obj.data)
+            with self.timings.measure('PHASE', 'Mode switch'):
+                bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        self.objs_to_check = collection_objects(self.collections)
+        self.max_costs = object_max_costs(self.collections)
+        if self.shard is not None:
+            self.objs_to_check = shard_objects(self.objs_to_check, *self.shard)
+        self.store = get_result_store(context.scene)
+        self.store.clear()
+        if len(self.collections) > 1:
+            self.store.set_collections(self.collections)
+        self.validation_data = context.scene.dc_validation_data
+        self.validation_data.reset(self.collection.name, len(self.objs_to_check))
+
+        for collection in self.collections:
+            print('Checking collection : ', collection.name)
+
+    def start_run(self, context):
         self.results.clear()
-        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-        bpy.ops.object.select_all(action='DESELECT')
-
-        objs_to_check = dc.get_objects(self.collection.all_objects, {'MESH'})
-        validation_data = context.scene.dc_validation_data
-        validation_data.reset(self.collection.name, len(objs_to_check))
+        self.skipped.clear()
+        self.pending.clear()
+        self.timings = ValidationTimings()
+        self.checked_count = 0
+        self.run_start = time.perf_counter()
 
-        print('Checking collection : ', self.collection.name)
-        self.examine_collection()
+        if self.cache is not None:
+            self.cache.use_settings(self.settings)
 
-        for obj in objs_to_check:
-            print('Checking object : ', obj.name)
-            self.examine_object(context, obj)
+        self.disk_counts = Counter()
+        self.evaluated_measurements = {}
+        if self.settings.use_disk_cache:
+            self.disk_cache = vc.open_cache(self.settings.disk_cache_size)
 
-        self.post_results(validation_data)
-        print("--------------------------------")
+        self.depsgraph = context.evaluated_depsgraph_get() if self.settings.use_evaluated else None
 
-    def examine_collection(self):
-        analyzer = CollectionAnalyzer(self.collection)
-        analysis_results = analyzer.find_problems()
-        self.process(analysis_results)
+    def end_run(self):
+        if self.cache is not None:
+            self.cache.commit()
 
-    def examine_object(self, context, obj):
-        prev_hide_viewport = obj.hide_viewport
-        obj.hide_viewport = False
+        if self.disk_cache is not None:
+            self.disk_counts.update(hits=self.disk_cache.hits, misses=self.disk_cache.misses)
+            self.disk_cache.close()
+            self.disk_cache = None
+        self.evaluated_measurements = {}
 
-        dc.make_active_object(context, obj)
+    def finish(self, cancelled=False):
+        self.end_run()
+        self.flush_results()
 
-        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+        for key in self.results:
+            errors = self.results[key]
+            print('{} errors: {}'.format(len(errors), key))
+            for err in errors[:10]:
+                print('  {}'.format(err))
+            if len(errors) > 10:
+                print('  ... and {} more'.format(len(errors) - 10))
 
-        # Find problems at the object level
-        analyzer = ObjectModeAnalyzer(obj)
-        analysis_results = analyzer.find_problems()
+        if cancelled:
+            print('Cancelled after {} of {} objects'.format(self.checked_count, len(self.objs_to_check)))
+        if self.disk_counts:
+            print('Disk cache: {} hits, {} misses'.format(self.disk_counts['hits'], self.disk_counts['misses']))
 
-        # Find problems at the edit-mode level
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        analyzer = EditModeAnalyzer(obj)
-        analysis_results += analyzer.find_problems()
+        self.store.timings = self.timings
+        self.validation_data.post_timings(time.perf_counter() - self.run_start, self.timings, self.disk_counts)
+        print("--------------------------------")
 
-        self.process(analysis_results)
+    def revalidate(self, context, objs, stale_names=()):
+        # Re-examine just these objects and swap their rows of the current report in place; collection rules are left as they were
+        self.start_run(context)
+        self.objs_to_check = objs
+        self.max_costs = object_max_costs(self.collections)
+        self.store = get_result_store(context.scene)
+        if self.store.collection_names:
+            self.store.set_collections(self.collections)
+        self.validation_data = context.scene.dc_validation_data
+        for _ in self.examine_objects(objs):
+            pass
+        self.end_run()
+
+        self.store.replace([obj.name for obj in objs], self.pending, stale_names)
+        self.validation_data.refresh(self.store)
+        self.pending.clear()
+
+    @property
+    def progress(self):
+        return self.checked_count / len(self.objs_to_check) if self.objs_to_check else 1.0
 
-        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-        obj.select_set(False)
-        obj.hide_viewport = prev_hide_viewport
+    def examine_collection(self):
+        for collection_index, collection in enumerate(self.collections):
+            with self.timings.measure('PHASE', 'Collection rules'):
+                analyzer = CollectionAnalyzer(collection, self.settings, self.timings)
+                analysis_results = analyzer.find_problems()
+            self.process(analysis_results)
+
+            # Posted right away so each finding stays tied to the collection it was found in
+            if len(self.collections) > 1:
+                with self.timings.measure('PHASE', 'Result posting'):
+                    self.store.add(self.pending, collection_index)
+                self.pending.clear()
+
+    def uses_evaluated(self, obj):
+        # Objects without active modifiers evaluate to their own mesh data, which can be shared and cached as usual
+        return self.depsgraph is not None and any(mod.show_viewport for mod in obj.modifiers)
+
+    def examine_objects(self, objs):
+        # Yields after every object so callers can spread the work over time
+        # Group objects by their mesh data so that shared meshes are only analyzed once
+        mesh_users = defaultdict(list)
+        evaluated_objs = []
+        for obj in objs:
+            approximate = self.settings.use_approximate and obj.name not in self.exact_objects
+            max_cost = self.max_costs.get(obj.name_full, 'EXPENSIVE')
+
+            # Modifier results depend on other objects too, so they are never served from the session cache
+            if self.uses_evaluated(obj):
+                evaluated_objs.append((obj, approximate, max_cost))
+                continue
+
+            if self.cache is not None and obj.name not in self.exact_objects:
+                with self.timings.measure('PHASE', 'Cache lookup'):
+                    analysis_results = self.cache.lookup(obj, max_cost)
+                if analysis_results is not None:
+                    print('Cached object   : ', obj.name)
+                    self.process(analysis_results)
+                    self.checked_count += 1
+                    yield
+                    continue
+
+            mesh_users[(obj.data.session_uid, approximate, max_cost)].append(obj)
+
+        for (_, approximate, max_cost), users in mesh_users.items():
+            yield from self.examine_mesh(users[0].data, users, approximate=approximate, max_cost=max_cost)
+
+        for obj, approximate, max_cost in evaluated_objs:
+            yield from self.examine_evaluated(obj, approximate, max_cost)
+
+    def examine_evaluated(self, obj, approximate, max_cost):
+        # The evaluated mesh only lives until its object is analyzed, keeping memory bounded on heavy modifier stacks
+        with self.timings.measure('PHASE', 'Evaluation'):
+            obj_eval = obj.evaluated_get(self.depsgraph)
+            mesh = obj_eval.to_mesh()
+
+        try:
+            yield from self.examine_mesh(mesh, [obj], evaluated=True, approximate=approximate, max_cost=max_cost)
+        finally:
+            obj_eval.to_mesh_clear()
+
+    def examine_mesh(self, mesh, users, evaluated=False, approximate=False, max_cost='EXPENSIVE'):
+        print('Checking mesh   : ', mesh.name, '({} users{})'.format(len(users), ', evaluated' if evaluated else ''))
+
+        arrays = self.cache.get_arrays(mesh) if self.cache is not None and not evaluated else None
+        mesh_analyzer = MeshAnalyzer(mesh, self.settings, arrays, self.timings, self.disk_cache, approximate, max_cost)
+
+        # Evaluated meshes are new datablocks every time; identical ones, like instances sharing a modifier stack, are measured once per run
+        evaluated_key = None
+        if evaluated:
+            evaluated_key = (mesh_analyzer.arrays.content_hash, approximate, max_cost)
+            mesh_analyzer.measurements = self.evaluated_measurements.get(evaluated_key)
+
+        try:
+            for obj in users:
+                print('Checking object : ', obj.name)
+
+                # The first user of a mesh also carries the cost of measuring it
+                with self.timings.measure('OBJECT', obj.name):
+                    # Find problems at the object level; these are cheap and run first
+                    stop_at_first_error = self.settings.stop_at_first_error
+                    analyzer = ObjectModeAnalyzer(obj, self.timings, max_cost, stop_at_first_error)
+                    analysis_results = analyzer.find_problems()
+
+                    # Find problems at the mesh level; element indices of an evaluated mesh cannot be selected on the object
+                    if not (stop_at_first_error and any(result.is_error for result in analysis_results)):
+                        mesh_results = mesh_analyzer.find_problems(obj)
+                        if evaluated:
+                            mesh_results = [result._replace(elements=None) for result in mesh_results]
+                        analysis_results += mesh_results
+
+                if self.cache is not None and not evaluated:
+                    self.cache.store(obj, analysis_results, max_cost)
+
+                self.process(analysis_results)
+                self.checked_count += 1
+                yield
+        finally:
+            if evaluated_key is not None and mesh_analyzer.measurements is not None:
+                self.evaluated_measurements[evaluated_key] = mesh_analyzer.measurements
+            mesh_analyzer.free()
 
     def process(self, analysis_results):
         for result in analysis_results:
@@ -395,20 +1555,33 @@ class Validator:
                 self.results[result.rule] = []
             if result.is_error:
                 self.results[result.rule].append(result)
-
-    def post_results(self, validation_data):
-        for key in self.results:
-            errors = self.results[key]
-            print('{} errors: {}'.format(len(errors), key))
-            for err in errors:
-                print('  {}'.format(err))
-
-                item = validation_data.results.add()
-                item.name = key.label
-                item.rule_category = key.category
-                item.rule_label = key.label
-                item.obj_name = err.obj.name if err.obj else ''
-                item.detail = err.detail
+                self.pending.append(result)
+            elif result.skipped:
+                self.skipped.append(result)
+                self.pending.append(result)
+
+    def merge(self, results, checked_count, disk_counts, skipped=()):
+        # Fold in the findings of another process which validated part of this collection
+        for rule, errors in results.items():
+            self.results[rule] += errors
+            self.pending += errors
+        self.skipped += skipped
+        self.pending += skipped
+        self.checked_count += checked_count
+        self.disk_counts.update(disk_counts)
+
+    def flush_results(self):
+        # Post everything found since the last flush
+        with self.timings.measure('PHASE', 'Result posting'):
+            self.store.add(self.pending)
+            self.validation_data.refresh(self.store)
+
+        self.pending.clear()
+
+
+validation_state = {
+    "validator": None,
+}
 
 #
 # Operators and UI
@@ -420,16 +1593,228 @@ class DCONFIG_OT_validate(bpy.types.Operator):
     bl_label = "DC Validate"
     bl_description = "Validate Model"
 
+    use_cache: bpy.props.BoolProperty(name="Use Cache", description="Only re-examine objects which changed since the last validation", default=True)
+    exact_estimated: bpy.props.BoolProperty(name="Exact Estimated", description="Re-validate the last report's collection, measuring objects with estimated findings exactly",
+                                            default=False, options={'SKIP_SAVE'})
+    scope: bpy.props.EnumProperty(name="Scope", options={'SKIP_SAVE'}, items=(
+        ('ACTIVE', "Active Collection", "Validate the active collection"),
+        ('SELECTED', "Selected Collections", "Validate the collections selected in the Outliner, checking objects shared between them once"),
+        ('SCENE', "Scene", "Validate the scene collection and every collection in it, checking each object once")))
+
+    # Work done per timer tick when running interactively
+    Time_Slice = 0.016
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validator = None
+        self.work = None
+        self.timer = None
+
     @classmethod
     def poll(cls, context):
-        return context.collection is not None
+        return context.collection is not None and validation_state["validator"] is None
+
+    def make_validator(self, context):
+        collection = context.collection
+        collections = None
+        exact_objects = None
+        if self.exact_estimated:
+            # Everything else comes back from the session cache as it was estimated before
+            report_collection, collections = get_report_collections(context.scene)
+            collection = report_collection or collection
+            exact_objects = get_result_store(context.scene).estimated_objects()
+        elif self.scope == 'SCENE':
+            collection = context.scene.collection
+            collections = [collection] + list(collection.children_recursive)
+        elif self.scope == 'SELECTED':
+            selected = [selected_id for selected_id in getattr(context, "selected_ids", ()) if isinstance(selected_id, bpy.types.Collection)]
+            if len(selected) > 1:
+                collection = context.scene.collection
+                collections = selected
+            elif selected:
+                collection = selected[0]
+
+        return Validator(collection, context.scene.dc_validation_settings, validation_cache if self.use_cache else None, exact_objects=exact_objects,
+                         collections=collections)
 
     def execute(self, context):
-        validator = Validator(context.collection)
+        validator = self.make_validator(context)
         validator.run(context)
 
         return {'FINISHED'}
 
+    def invoke(self, context, event):
+        dc.trace_enter(self)
+
+        self.validator = self.make_validator(context)
+        self.validator.begin(context)
+        self.work = self.validator.examine_objects(self.validator.objs_to_check)
+        validation_state["validator"] = self.validator
+
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, 1)
+        self.timer = window_manager.event_timer_add(0.02, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            return self.finish(context, True)
+
+        if event.type == 'TIMER':
+            try:
+                return self.step(context)
+            except BaseException:
+                # A failing rule must not leave the validator claimed for the rest of the session
+                self.cancel(context)
+                raise
+
+        return {'PASS_THROUGH'}
+
+    def step(self, context):
+        deadline = time.perf_counter() + self.Time_Slice
+        try:
+            while time.perf_counter() < deadline:
+                next(self.work)
+        except StopIteration:
+            return self.finish(context, False)
+        except ReferenceError:
+            # Something being validated was deleted in the meantime
+            self.report({'WARNING'}, "Validation stopped, data was removed while validating")
+            return self.finish(context, True)
+
+        # Stream what was found so far into the report
+        self.validator.flush_results()
+        self.validator.validation_data.progress = self.validator.progress
+        context.window_manager.progress_update(self.validator.progress)
+        self.redraw(context)
+        return {'PASS_THROUGH'}
+
+    def finish(self, context, cancelled):
+        # Partial results are kept when cancelled
+        try:
+            self.work.close()
+            self.validator.finish(cancelled)
+            self.validator.validation_data.progress = self.validator.progress
+        finally:
+            self.release(context)
+        self.redraw(context)
+
+        return dc.user_canceled(self) if cancelled else dc.trace_exit(self)
+
+    def cancel(self, context):
+        # Blender cancels the operator when the file is replaced or the window closes; the report may be gone, so only clean up
+        try:
+            self.work.close()
+            self.validator.end_run()
+        finally:
+            self.release(context)
+
+    def release(self, context):
+        if self.timer is not None:
+            window_manager = context.window_manager
+            window_manager.event_timer_remove(self.timer)
+            window_manager.progress_end()
+            self.timer = None
+        if validation_state["validator"] is self.validator:
+            validation_state["validator"] = None
+
+    def redraw(self, context):
+        if context.screen is None:
+            return
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class DCONFIG_OT_validation_page(bpy.types.Operator):
+    bl_idname = "dconfig.validation_page"
+    bl_label = "DC Validation Page"
+    bl_description = "Show another page of validation results"
+
+    step: bpy.props.IntProperty(default=1)
+
+    @classmethod
+    def poll(cls, context):
+        return len(get_result_store(context.scene)) > 0
+
+    def execute(self, context):
+        validation_data = context.scene.dc_validation_data
+        validation_data.page = max(0, min(validation_data.page + self.step, validation_data.page_count - 1))
+        validation_data.refresh(get_result_store(context.scene))
+
+        return {'FINISHED'}
+
+
+class DCONFIG_OT_export_validation_timings(bpy.types.Operator, ExportHelper):
+    bl_idname = "dconfig.export_validation_timings"
+    bl_label = "DC Export Validation Timings"
+    bl_description = "Export the timings of the last validation run as JSON"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    @classmethod
+    def poll(cls, context):
+        return get_result_store(context.scene).timings is not None or len(context.scene.dc_validation_data.timings) > 0
+
+    def execute(self, context):
+        dc.trace_enter(self)
+
+        # Every object's timing lives on the store; the scene only keeps the slowest, e.g. after reopening the file
+        validation_data = context.scene.dc_validation_data
+        timings = get_result_store(context.scene).timings
+        if timings is not None:
+            timings = [{"kind": kind, "name": name, "seconds": seconds, "count": count} for kind, name, seconds, count in timings.items()]
+        else:
+            timings = [{"kind": t.kind, "name": t.name, "seconds": t.seconds, "count": t.count} for t in validation_data.timings]
+        report = {
+            "collection": validation_data.collection_name,
+            "object_count": validation_data.check_count,
+            "total_seconds": validation_data.total_time,
+            "blender_version": bpy.app.version_string,
+            "file": bpy.data.filepath,
+            "timings": timings,
+        }
+
+        with open(self.filepath, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        return dc.trace_exit(self)
+
+
+class DCONFIG_OT_select_distorted(bpy.types.Operator):
+    bl_idname = "dconfig.select_distorted"
+    bl_label = "DC Select Distorted"
+    bl_description = "Select faces which are distorted, i.e. non-planar beyond the given angle"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_distortion: bpy.props.FloatProperty(name="Max Distortion", default=GeometryDistortionRule.Max_Distortion, min=0, max=math.pi, subtype='ANGLE')
+    extend: bpy.props.BoolProperty(name="Extend", description="Extend the selection", default=False)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'EDIT_MESH'
+
+    def execute(self, context):
+        dc.trace_enter(self)
+
+        if not self.extend:
+            bpy.ops.mesh.select_all(action='DESELECT')
+
+        for obj in context.objects_in_mode_unique_data:
+            obj.update_from_editmode()
+            distorted = np.flatnonzero(ma.distorted_faces(ma.MeshArrays(obj.data), self.max_distortion))
+            dc.trace(1, "Found {} distorted faces on {}", len(distorted), dc.full_name(obj))
+
+            bm = bmesh.from_edit_mesh(obj.data)
+            bm.faces.ensure_lookup_table()
+            for index in distorted:
+                bm.faces[index].select_set(True)
+            bmesh.update_edit_mesh(obj.data)
+
+        return dc.trace_exit(self)
+
 
 class DCONFIG_OT_scene_stats(bpy.types.Operator):
     bl_idname = "dconfig.scene_stats"
@@ -517,11 +1902,23 @@ class DCONFIG_UL_validation_items(bpy.types.UIList):
         split = split.split(factor=0.30, align=True)
         split.alignment = 'LEFT'
         split.label(text=item.rule_label)
-        split.label(text=item.detail)
+        detail = "{} [{}]".format(item.detail, item.collections) if item.collections else item.detail
+        split.label(text=detail, icon='TIME' if item.estimated else 'NONE')
 
     def invoke(self, context, event):
         pass
 
+    def draw_filter(self, context, layout):
+        # The filter applies to every finding in the store, not only to the rows of this page; the store also sorts them, so the page keeps its order
+        layout.prop(context.scene.dc_validation_data, "filter_text", text="", icon='VIEWZOOM')
+
+
+class DCONFIG_UL_validation_rules(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        split = layout.split(factor=0.85, align=True)
+        split.label(text=item.name if index == 0 else "{}: {}".format(item.rule_category, item.name))
+        split.label(text=str(item.count))
+
 
 class DCONFIG_PT_validate_results(bpy.types.Panel):
     bl_space_type = 'VIEW_3D'
@@ -536,16 +1933,209 @@ class DCONFIG_PT_validate_results(bpy.types.Panel):
         row = layout.row()
         row.label(text="Collection: " + validation_data.collection_name)
         row.label(text="Object count: {}".format(validation_data.check_count))
+
+        if validation_state["validator"] is not None:
+            text = "Validating... (Esc to cancel)"
+            if bpy.app.version >= (4, 0, 0):
+                layout.progress(factor=validation_data.progress, type='BAR', text=text)
+            else:
+                layout.label(text="{} {:.0f}%".format(text, validation_data.progress * 100))
+
         layout.separator()
-        layout.label(text="Result count: {}".format(len(validation_data.results)))
+        layout.label(text="Result count: {}".format(validation_data.result_count))
+        store = get_result_store(context.scene)
+        if store.unchecked:
+            layout.label(text="{} objects only partly checked in approximate mode".format(len(store.unchecked)), icon='TIME')
+        if (store.estimated or store.unchecked) and validation_state["validator"] is None:
+            dc.setup_op(layout, "dconfig.validate", icon='TIME', text="Validate Estimated Exactly", exact_estimated=True)
+        if len(store) > 0 and validation_state["validator"] is None:
+            row = layout.row(align=True)
+            dc.setup_op(row, "dconfig.validation_fix", icon='TOOL_SETTINGS', text="Fix All")
+            dc.setup_op(row, "dconfig.validation_fix", icon='VIEWZOOM', text="Dry Run", dry_run=True)
+        layout.template_list("DCONFIG_UL_validation_rules", "", validation_data, "rule_counts", validation_data, "rule_count_index", rows=3)
+        if len(validation_data.collection_counts) > 0:
+            col = layout.column(align=True)
+            for item in validation_data.collection_counts:
+                split = col.split(factor=0.85, align=True)
+                split.label(text=item.name, icon='OUTLINER_COLLECTION')
+                split.label(text=str(item.count))
+
+        row = layout.row(align=True)
+        row.prop(validation_data, "sort_by", text="")
+        dc.setup_op(row, "dconfig.validation_page", icon='TRIA_LEFT', step=-1)
+        row.label(text="{} / {}".format(validation_data.page + 1, validation_data.page_count))
+        dc.setup_op(row, "dconfig.validation_page", icon='TRIA_RIGHT', step=1)
         layout.template_list("DCONFIG_UL_validation_items", "", validation_data, "results", validation_data, "result_index", rows=5)
 
 
+class DCONFIG_UL_validation_timings(bpy.types.UIList):
+    filter_kind: bpy.props.EnumProperty(name="Kind", items=(
+        ('ALL', "All", ""),
+        ('PHASE', "Phases", ""),
+        ('RULE', "Rules", ""),
+        ('OBJECT', "Objects", "")))
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        split = layout.split(factor=0.75, align=True)
+        split.label(text=item.name)
+        split.label(text="{:.3f}s".format(item.seconds))
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_kind", expand=True)
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+    def filter_items(self, context, data, propname):
+        timings = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+
+        flt_flags = [self.bitflag_filter_item] * len(timings)
+        if self.filter_name:
+            flt_flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, timings, "name")
+        if self.filter_kind != 'ALL':
+            flt_flags = [flag if t.kind == self.filter_kind else 0 for flag, t in zip(flt_flags, timings)]
+
+        # Slowest first unless sorting by name
+        if self.use_filter_sort_alpha:
+            flt_neworder = helper.sort_items_by_name(timings, "name")
+        else:
+            flt_neworder = helper.sort_items_helper([(i, -t.seconds) for i, t in enumerate(timings)], key=lambda item: item[1])
+
+        return flt_flags, flt_neworder
+
+
+class DCONFIG_PT_validate_timings(bpy.types.Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "DC"
+    bl_label = "Timings"
+    bl_parent_id = "DCONFIG_PT_validate_results"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        validation_data = context.scene.dc_validation_data
+
+        row = layout.row()
+        row.label(text="Total: {:.3f}s".format(validation_data.total_time))
+        row.operator("dconfig.export_validation_timings", text="", icon='EXPORT')
+        if validation_data.disk_cache_hits or validation_data.disk_cache_misses:
+            layout.label(text="Disk cache: {} hits, {} misses".format(validation_data.disk_cache_hits, validation_data.disk_cache_misses))
+        if validation_data.object_timing_count > validation_data.Timing_Object_Limit:
+            layout.label(text="Slowest {} of {} objects; export for all".format(validation_data.Timing_Object_Limit, validation_data.object_timing_count))
+        layout.template_list("DCONFIG_UL_validation_timings", "", validation_data, "timings", validation_data, "timing_index", rows=5)
+
+
+class DCONFIG_PT_validate_settings(bpy.types.Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "DC"
+    bl_label = "Settings"
+    bl_parent_id = "DCONFIG_PT_validate_results"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        settings = context.scene.dc_validation_settings
+
+        col = layout.column(align=True)
+        col.prop(settings, "coincident_distance")
+        col.prop(settings, "use_evaluated")
+
+        col = layout.column(align=True)
+        if context.collection is not None:
+            col.prop(context.collection, "dc_validation_profile", text="Profile ({})".format(context.collection.name))
+        col.prop(settings, "stop_at_first_error")
+
+        col = layout.column(align=True)
+        col.prop(settings, "use_approximate")
+        row = col.row(align=True)
+        row.active = settings.use_approximate
+        row.prop(settings, "approximate_min_faces")
+        row.prop(settings, "approximate_time_budget")
+        col.prop(settings, "use_cross_object_coincident")
+        col.prop(settings, "use_collection_uv_overlap")
+        col.prop(settings, "use_interpenetration")
+
+        col = layout.column(align=True)
+        col.prop(settings, "max_uv_area_stretch")
+        col.prop(settings, "max_uv_angle_distortion")
+        col.prop(settings, "use_texel_density")
+        row = col.row()
+        row.active = settings.use_texel_density
+        row.prop(settings, "texel_density_tolerance")
+
+        col = layout.column(align=True)
+        col.prop(settings, "min_wall_thickness")
+        row = col.row(align=True)
+        row.active = settings.min_wall_thickness > 0
+        row.prop(settings, "wall_thickness_max_rays")
+
+        col = layout.column(align=True)
+        col.prop(settings, "show_overlay")
+        col.prop(settings, "use_watch")
+        row = col.row()
+        row.active = settings.use_watch
+        row.prop(settings, "watch_delay")
+
+        col = layout.column(align=True)
+        col.prop(settings, "use_disk_cache")
+        row = col.row()
+        row.active = settings.use_disk_cache
+        row.prop(settings, "disk_cache_size")
+
+
 class DCONFIG_ValidationResultCollection(bpy.types.PropertyGroup):
     rule_category: bpy.props.StringProperty()
     rule_label: bpy.props.StringProperty()
     obj_name: bpy.props.StringProperty()
     detail: bpy.props.StringProperty()
+    estimated: bpy.props.BoolProperty()
+    collections: bpy.props.StringProperty()
+    store_index: bpy.props.IntProperty()
+
+
+class DCONFIG_ValidationRuleCountCollection(bpy.types.PropertyGroup):
+    rule_category: bpy.props.StringProperty()
+    count: bpy.props.IntProperty()
+
+
+class DCONFIG_ValidationTimingCollection(bpy.types.PropertyGroup):
+    kind: bpy.props.StringProperty()
+    seconds: bpy.props.FloatProperty()
+    count: bpy.props.IntProperty()
+
+
+def select_elements(mesh, elements):
+    # Select exactly the given elements, plus the verts and edges of selected faces and edges, in object mode
+    arrays = ma.MeshArrays(mesh)
+    indices = np.asarray(elements.indices)
+    domain_size = {'VERT': arrays.vert_count, 'EDGE': arrays.edge_count, 'FACE': arrays.face_count}[elements.domain]
+    if indices.size > 0 and indices.max() >= domain_size:
+        return False
+
+    verts = np.zeros(arrays.vert_count, dtype=bool)
+    edges = np.zeros(arrays.edge_count, dtype=bool)
+    faces = np.zeros(arrays.face_count, dtype=bool)
+    if elements.domain == 'FACE':
+        faces[indices] = True
+        _, loops = ma.expand_ranges(indices, arrays.loop_starts[indices], arrays.face_sizes[indices])
+        verts[arrays.loop_verts[loops]] = True
+        edges[arrays.loop_edges[loops]] = True
+    elif elements.domain == 'EDGE':
+        edges[indices] = True
+        verts[arrays.edge_verts[indices].ravel()] = True
+    else:
+        verts[indices] = True
+
+    mesh.vertices.foreach_set("select", verts)
+    mesh.edges.foreach_set("select", edges)
+    mesh.polygons.foreach_set("select", faces)
+    mesh.update()
+    return True
 
 
 def DCONFIG_FN_index_update(self, context):
@@ -554,6 +2144,9 @@ def DCONFIG_FN_index_update(self, context):
         if result.obj_name == '':
             return
 
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
         if context.space_data.local_view is not None:
             bpy.ops.view3d.localview(frame_selected=True)
 
@@ -564,13 +2157,55 @@ def DCONFIG_FN_index_update(self, context):
         dc.make_active_object(context, obj)
         bpy.ops.view3d.localview(frame_selected=True)
 
+        # Element level findings open the mesh with just the offending elements selected
+        elements = get_result_store(context.scene).elements.get(result.store_index)
+        if elements is None or obj.type != 'MESH':
+            return
+
+        if not select_elements(obj.data, elements):
+            print("Mesh '{}' changed since it was validated, its elements can no longer be selected".format(obj.data.name))
+            return
+
+        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        context.tool_settings.mesh_select_mode = (elements.domain == 'VERT', elements.domain == 'EDGE', elements.domain == 'FACE')
+        bpy.ops.view3d.view_selected()
+
+
+def DCONFIG_FN_view_update(self, context):
+    if self.update_enabled:
+        self.page = 0
+        self.refresh(get_result_store(context.scene))
+
 
 class DCONFIG_ValidationData(bpy.types.PropertyGroup):
+    # Slowest objects listed in the timings; the export has all of them
+    Timing_Object_Limit = 50
+
     collection_name: bpy.props.StringProperty()
     check_count: bpy.props.IntProperty()
     result_index: bpy.props.IntProperty(update=DCONFIG_FN_index_update)
     results: bpy.props.CollectionProperty(type=DCONFIG_ValidationResultCollection)
+    result_count: bpy.props.IntProperty()
+    rule_count_index: bpy.props.IntProperty(update=DCONFIG_FN_view_update)
+    rule_counts: bpy.props.CollectionProperty(type=DCONFIG_ValidationRuleCountCollection)
+    collection_counts: bpy.props.CollectionProperty(type=DCONFIG_ValidationRuleCountCollection)
+    sort_by: bpy.props.EnumProperty(name="Sort By", update=DCONFIG_FN_view_update, items=(
+        ('NONE', "Found Order", "Sort findings in the order they were found"),
+        ('CATEGORY', "Category", "Sort findings by category, then rule and object"),
+        ('RULE', "Rule", "Sort findings by rule, then object"),
+        ('OBJECT', "Object", "Sort findings by object, then rule")))
+    filter_text: bpy.props.StringProperty(name="Filter", description="Only show findings whose detail matches this text, * and ? as wildcards",
+                                          update=DCONFIG_FN_view_update)
+    page: bpy.props.IntProperty()
+    page_count: bpy.props.IntProperty(default=1)
     update_enabled: bpy.props.BoolProperty()
+    progress: bpy.props.FloatProperty(subtype='FACTOR', min=0, max=1)
+    total_time: bpy.props.FloatProperty()
+    disk_cache_hits: bpy.props.IntProperty()
+    disk_cache_misses: bpy.props.IntProperty()
+    timing_index: bpy.props.IntProperty()
+    timings: bpy.props.CollectionProperty(type=DCONFIG_ValidationTimingCollection)
+    object_timing_count: bpy.props.IntProperty()
 
     def reset(self, collection_name, obj_count):
         self.update_enabled = False
@@ -578,19 +2213,169 @@ class DCONFIG_ValidationData(bpy.types.PropertyGroup):
         self.check_count = obj_count
         self.result_index = 0
         self.results.clear()
+        self.result_count = 0
+        self.rule_count_index = 0
+        self.rule_counts.clear()
+        self.collection_counts.clear()
+        self.page = 0
+        self.page_count = 1
+        self.progress = 0
+        self.total_time = 0
+        self.disk_cache_hits = 0
+        self.disk_cache_misses = 0
+        self.timing_index = 0
+        self.timings.clear()
+        self.object_timing_count = 0
         self.update_enabled = True
 
+    def refresh(self, store):
+        # Rebuild the per-rule counts and the visible page from the result store
+        self.update_enabled = False
+
+        self.rule_counts.clear()
+        item = self.rule_counts.add()
+        item.name = "All"
+        item.count = len(store)
+        for rule, count in zip(store.rules, store.rule_counts()):
+            item = self.rule_counts.add()
+            item.name = rule.label
+            item.rule_category = rule.category
+            item.count = count
+        if self.rule_count_index >= len(self.rule_counts):
+            self.rule_count_index = 0
+
+        self.collection_counts.clear()
+        for name, count in zip(store.collection_names, store.collection_counts().tolist()):
+            item = self.collection_counts.add()
+            item.name = name
+            item.count = count
+
+        view = store.make_view(self.rule_count_index - 1, self.sort_by, self.filter_text)
+        self.result_count = len(view)
+        self.page_count = max(1, math.ceil(len(view) / store.Page_Size))
+        self.page = min(self.page, self.page_count - 1)
+
+        self.results.clear()
+        start = self.page * store.Page_Size
+        for index in view[start:start + store.Page_Size].tolist():
+            rule = store.rules[store.rule_indices[index]]
+            obj_index = store.obj_indices[index]
+            item = self.results.add()
+            item.name = rule.label
+            item.rule_category = rule.category
+            item.rule_label = rule.label
+            item.obj_name = store.obj_names[obj_index] if obj_index >= 0 else ''
+            item.detail = store.details[index]
+            item.estimated = index in store.estimated
+            item.collections = ", ".join(store.collections_of(index))
+            item.store_index = index
+        if self.result_index >= len(self.results):
+            self.result_index = 0
+
+        self.update_enabled = True
+
+    def post_timings(self, total_time, timings, disk_counts):
+        self.total_time = total_time
+        self.disk_cache_hits = disk_counts['hits']
+        self.disk_cache_misses = disk_counts['misses']
+
+        # One RNA item per object would be as slow as the findings were; only the slowest objects are listed
+        items = timings.items()
+        objects = [item for item in items if item[0] == 'OBJECT']
+        self.object_timing_count = len(objects)
+        shown = [item for item in items if item[0] != 'OBJECT'] + objects[:self.Timing_Object_Limit]
+
+        self.timings.clear()
+        for kind, name, seconds, count in shown:
+            item = self.timings.add()
+            item.name = name
+            item.kind = kind
+            item.seconds = seconds
+            item.count = count
+
+
+def DCONFIG_FN_overlay_update(self, context):
+    for area in context.screen.areas:
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+
+
+class DCONFIG_ValidationSettings(bpy.types.PropertyGroup):
+    coincident_distance: bpy.props.FloatProperty(name="Merge Distance", description="Vertices closer than this are considered coincident",
+                                                 default=0.0001, min=0.0, precision=5, subtype='DISTANCE')
+    use_cross_object_coincident: bpy.props.BoolProperty(name="Cross-Object Doubles", description="Also find vertices of different objects lying on top of each other",
+                                                        default=False)
+    use_collection_uv_overlap: bpy.props.BoolProperty(name="Cross-Object UV Overlap", description="Also find UVs overlapping between different meshes of the collection",
+                                                      default=False)
+    min_wall_thickness: bpy.props.FloatProperty(name="Min Wall Thickness", description="Walls thinner than this are reported, 0 to disable",
+                                                default=0.0, min=0.0, precision=4, subtype='DISTANCE')
+    wall_thickness_max_rays: bpy.props.IntProperty(name="Max Rays", description="Meshes with more faces are checked on a sample of this many faces",
+                                                   default=200000, min=1)
+    use_interpenetration: bpy.props.BoolProperty(name="Interpenetration", description="Also find objects of the collection penetrating each other",
+                                                 default=False)
+    max_uv_area_stretch: bpy.props.FloatProperty(name="Max UV Area Stretch", description="Faces taking this many times more, or less, of the UV layout than of the surface are stretched",
+                                                 default=4.0, min=1.0)
+    max_uv_angle_distortion: bpy.props.FloatProperty(name="Max UV Angle Distortion", description="Faces whose UV corner angles differ more than this from the 3D angles are stretched",
+                                                     default=math.radians(30), min=0.0, max=math.pi, subtype='ANGLE')
+    use_texel_density: bpy.props.BoolProperty(name="Texel Density", description="Also find objects whose texel density differs from the collection median",
+                                              default=False)
+    texel_density_tolerance: bpy.props.FloatProperty(name="Density Tolerance", description="Objects with more than this many times, or less than 1/this, the median texel density are reported",
+                                                     default=2.0, min=1.0)
+    use_approximate: bpy.props.BoolProperty(name="Approximate", description="Estimate rules on a sample of large meshes instead of measuring every element",
+                                            default=False)
+    approximate_min_faces: bpy.props.IntProperty(name="Min Faces", description="Meshes with fewer faces are always measured exactly",
+                                                 default=1000000, min=1)
+    approximate_time_budget: bpy.props.FloatProperty(name="Time Budget", description="Seconds of sampling allowed per mesh",
+                                                     default=1.0, min=0.01)
+    use_evaluated: bpy.props.BoolProperty(name="Evaluated Geometry", description="Validate meshes with their modifiers applied",
+                                          default=False)
+    stop_at_first_error: bpy.props.BoolProperty(name="Stop at First Error", description="Skip the remaining, costlier rules of an object once one rule reports an error",
+                                                default=False)
+    show_overlay: bpy.props.BoolProperty(name="Show Findings", description="Draw the elements of every finding in the viewport, colored by rule category",
+                                         default=False, update=DCONFIG_FN_overlay_update)
+    use_watch: bpy.props.BoolProperty(name="Watch", description="Re-validate objects of the report's collection as they change",
+                                      default=False)
+    watch_delay: bpy.props.FloatProperty(name="Delay", description="Seconds without changes before changed objects are re-validated",
+                                         default=1.0, min=0.1)
+    use_disk_cache: bpy.props.BoolProperty(name="Disk Cache", description="Reuse mesh measurements of identical geometry across sessions and files",
+                                           default=True)
+    disk_cache_size: bpy.props.IntProperty(name="Max Entries", description="Least recently used meshes are dropped from the disk cache beyond this count",
+                                           default=100000, min=100)
+
+    # Settings which do not change what the rules find
+    Uncached_Properties = {'rna_type', 'use_disk_cache', 'disk_cache_size', 'use_watch', 'watch_delay', 'show_overlay'}
+
+    def cache_key(self):
+        return tuple(getattr(self, prop.identifier) for prop in self.bl_rna.properties if prop.identifier not in self.Uncached_Properties)
+
 
 def DCONFIG_FN_ui_validate(self, context):
     self.layout.operator("dconfig.validate")
+    self.layout.operator("dconfig.validate", text="DC Validate Selected").scope = 'SELECTED'
+    self.layout.operator("dconfig.validate", text="DC Validate Scene").scope = 'SCENE'
+    self.layout.operator("dconfig.validate_sharded")
     self.layout.operator("dconfig.scene_stats")
 
 
 def register():
     bpy.types.OUTLINER_MT_collection.append(DCONFIG_FN_ui_validate)
     bpy.types.Scene.dc_validation_data = bpy.props.PointerProperty(type=DCONFIG_ValidationData)
+    bpy.types.Scene.dc_validation_settings = bpy.props.PointerProperty(type=DCONFIG_ValidationSettings)
+    bpy.types.Collection.dc_validation_profile = bpy.props.EnumProperty(name="Rule Profile", default='FULL', items=(
+        ('QUICK', "Quick", "Only run cheap rules on this collection"),
+        ('STANDARD', "Standard", "Run cheap and moderately expensive rules on this collection"),
+        ('FULL', "Full", "Run every rule on this collection")))
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_handler)
+    bpy.app.handlers.load_post.append(load_handler)
 
 
 def unregister():
     bpy.types.OUTLINER_MT_collection.remove(DCONFIG_FN_ui_validate)
     del bpy.types.Scene.dc_validation_data
+    del bpy.types.Scene.dc_validation_settings
+    del bpy.types.Collection.dc_validation_profile
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_handler)
+    bpy.app.handlers.load_post.remove(load_handler)
+    if bpy.app.timers.is_registered(watch_timer):
+        bpy.app.timers.unregister(watch_timer)
+    validation_cache.clear()
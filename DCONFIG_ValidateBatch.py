@@ -0,0 +1,472 @@
+# ------------------------------------------------------------
+# Copyright(c) 2018-2020 Jesse Yurkovich
+# Licensed under the MIT License <http://opensource.org/licenses/MIT>.
+# See the LICENSE file in the repo root for full license information.
+# ------------------------------------------------------------
+
+#
+# Headless validation of many .blend files
+#
+# blender -b -P DCONFIG_ValidateBatch.py -- [options] files...
+#
+#   files               .blend files, glob patterns, or @list.txt files with one path per line
+#   --collection NAME   Collection to validate in each file (default: the scene collection)
+#   --jobs N            Number of worker Blender processes (default: CPU count)
+#   --chunk N           Files handed to a worker process at a time (default: 8)
+#   --timeout SECONDS   Time a worker gets for its chunk before it is killed, 0 for none (default: 3600)
+#   --json PATH         Merged JSON report
+#   --junit PATH        Merged JUnit XML report
+#
+# The DC Validate (Parallel) operator reuses the worker side to split one large collection of the
+# saved file into shards, one per background process, and merges the results into the open session.
+#
+
+from concurrent.futures import (ThreadPoolExecutor, as_completed)
+from pathlib import Path
+import argparse
+import glob
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import bpy
+import numpy as np
+
+# Relative imports only resolve once this file is imported as part of the add-on, see __main__ below
+if __package__:
+    from . import DCONFIG_Utils as dc
+    from . import DCONFIG_Validate as validate
+
+
+#
+# Reports
+#
+
+def make_error(err):
+    error = {"object": err.obj.name if err.obj else "", "detail": err.detail}
+    if err.elements is not None:
+        error["elements"] = {"domain": err.elements.domain, "indices": err.elements.indices.tolist()}
+    if err.estimated:
+        error["estimated"] = True
+    return error
+
+
+def make_report(validator, filepath):
+    rules = []
+    for rule, errors in validator.results.items():
+        rules.append({
+            "category": rule.category,
+            "label": rule.label,
+            "errors": [make_error(err) for err in errors],
+        })
+
+    return {
+        "file": filepath,
+        "collection": validator.collection.name,
+        "object_count": len(validator.objs_to_check),
+        "total_seconds": time.perf_counter() - validator.run_start,
+        "rules": rules,
+        "skipped": [{"category": result.rule.category, "label": result.rule.label, "object": result.obj.name, "detail": result.detail}
+                    for result in validator.skipped],
+        "disk_cache": {"hits": validator.disk_counts['hits'], "misses": validator.disk_counts['misses']},
+        "timings": [{"kind": kind, "name": name, "seconds": seconds, "count": count} for kind, name, seconds, count in validator.timings.items()],
+    }
+
+
+def make_failure(filepath, message):
+    return {"file": filepath, "failure": message, "rules": []}
+
+
+def read_elements(error):
+    elements = error.get("elements")
+    if elements is None:
+        return None
+    return validate.ElementSet(elements["domain"], np.array(elements["indices"], dtype=np.int32))
+
+
+def read_results(report):
+    # Inverse of make_report, against the objects of the open file
+    results = {}
+    for rule_data in report["rules"]:
+        rule = validate.Rule(rule_data["category"], rule_data["label"])
+        results[rule] = [validate.RuleResult(rule, True, bpy.data.objects.get(err["object"]) if err["object"] else None, err["detail"],
+                                             read_elements(err), err.get("estimated", False))
+                         for err in rule_data["errors"]]
+
+    return results
+
+
+def read_skipped(report):
+    # Objects a worker only partly checked in approximate mode
+    skipped = []
+    for result in report["skipped"]:
+        obj = bpy.data.objects.get(result["object"])
+        if obj is not None:
+            skipped.append(validate.RuleResult(validate.Rule(result["category"], result["label"]), False, obj, result["detail"], skipped=True))
+    return skipped
+
+
+def error_count(report):
+    return sum(len(rule["errors"]) for rule in report["rules"])
+
+
+def write_junit(reports, path):
+    suites = ET.Element("testsuites")
+    for report in reports:
+        suite = ET.SubElement(suites, "testsuite", name=report["file"])
+        if "failure" in report:
+            case = ET.SubElement(suite, "testcase", classname=report["file"], name="validate")
+            ET.SubElement(case, "error", message="Validation did not run").text = report["failure"]
+            suite.set("tests", "1")
+            suite.set("errors", "1")
+            suite.set("failures", "0")
+            continue
+
+        failures = 0
+        for rule in report["rules"]:
+            case = ET.SubElement(suite, "testcase", classname=report["file"], name="{}: {}".format(rule["category"], rule["label"]))
+            if rule["errors"]:
+                failures += 1
+                failure = ET.SubElement(case, "failure", message="{} errors".format(len(rule["errors"])))
+                failure.text = "\n".join(err["detail"] for err in rule["errors"])
+
+        suite.set("tests", str(len(report["rules"])))
+        suite.set("failures", str(failures))
+        suite.set("errors", "0")
+        suite.set("time", "{:.3f}".format(report.get("total_seconds", 0)))
+
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+#
+# Worker process: validate each assigned file in turn, or one shard of the file it was started with
+#
+
+def ensure_registered():
+    # Workers run with --factory-startup, so the add-on is only registered if it is loaded here
+    if not hasattr(bpy.types.Scene, "dc_validation_data"):
+        importlib.import_module(__package__).register()
+
+
+def validate_current_file(collection_name, scene_name="", shard=None):
+    scene = bpy.data.scenes.get(scene_name) if scene_name else bpy.context.scene
+    if scene is None:
+        return make_failure(bpy.data.filepath, "Scene '{}' not found".format(scene_name))
+
+    collection = bpy.data.collections.get(collection_name) if collection_name else scene.collection
+    if collection is None:
+        return make_failure(bpy.data.filepath, "Collection '{}' not found".format(collection_name))
+
+    validator = validate.Validator(collection, scene.dc_validation_settings, shard=shard)
+    validator.run(bpy.context)
+    return make_report(validator, bpy.data.filepath)
+
+
+def run_worker(args):
+    ensure_registered()
+
+    reports = []
+    if args.manifest:
+        with open(args.manifest) as f:
+            files = json.load(f)
+
+        for filepath in files:
+            try:
+                bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+                reports.append(validate_current_file(args.collection))
+            except Exception as ex:
+                reports.append(make_failure(filepath, str(ex)))
+    else:
+        # Sharded: the file was opened on the command line and is only read
+        try:
+            reports.append(validate_current_file(args.collection, args.scene, (args.shard, args.shards)))
+        except Exception as ex:
+            reports.append(make_failure(bpy.data.filepath, str(ex)))
+
+    with open(args.output, 'w') as f:
+        json.dump(reports, f)
+
+    return 0
+
+
+#
+# Coordinator: fan files out over worker processes and merge their reports
+#
+
+def expand_files(patterns):
+    files = []
+    for pattern in patterns:
+        if pattern.startswith("@"):
+            with open(pattern[1:]) as f:
+                files += [line.strip() for line in f if line.strip()]
+        elif glob.has_magic(pattern):
+            files += sorted(glob.glob(pattern, recursive=True))
+        else:
+            files.append(pattern)
+
+    return [os.path.abspath(f) for f in files]
+
+
+def run_chunk(blender, files, collection, temp_dir, index, timeout=None):
+    manifest = os.path.join(temp_dir, "manifest_{}.json".format(index))
+    output = os.path.join(temp_dir, "report_{}.json".format(index))
+    with open(manifest, 'w') as f:
+        json.dump(files, f)
+
+    command = worker_command(blender, None, collection, output) + ["--manifest", manifest]
+    try:
+        process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # A hung worker is killed and, like a crashed one, fails every file it was given
+        message = "Worker timed out after {}s".format(timeout)
+        return [make_failure(f, message) for f in files]
+
+    return read_output(output, files, process.returncode, process.stderr)
+
+
+def worker_command(blender, filepath, collection, output):
+    command = [blender, "-b", "--factory-startup"]
+    if filepath:
+        command.append(filepath)
+    command += ["-P", __file__, "--", "--worker", "--output", output]
+    if collection:
+        command += ["--collection", collection]
+    return command
+
+
+def read_output(output, files, returncode, stderr):
+    if not os.path.exists(output):
+        # The worker crashed; report every file it was given as failed
+        message = "Worker exited with code {}: {}".format(returncode, stderr[-2000:])
+        return [make_failure(f, message) for f in files]
+
+    with open(output) as f:
+        return json.load(f)
+
+
+def run_pool(args):
+    files = expand_files(args.files)
+    if not files:
+        print("No files to validate")
+        return 2
+
+    blender = args.blender or bpy.app.binary_path
+    chunks = [files[i:i + args.chunk] for i in range(0, len(files), args.chunk)]
+    print("Validating {} files in {} chunks with {} workers".format(len(files), len(chunks), args.jobs))
+
+    start = time.perf_counter()
+    reports = []
+    with tempfile.TemporaryDirectory() as temp_dir, ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        timeout = args.timeout or None
+        futures = [pool.submit(run_chunk, blender, chunk, args.collection, temp_dir, i, timeout) for i, chunk in enumerate(chunks)]
+        for future in as_completed(futures):
+            for report in future.result():
+                print("{:>6} errors : {}".format(error_count(report) if "failure" not in report else "FAILED", report["file"]))
+                reports.append(report)
+
+    reports.sort(key=lambda report: report["file"])
+    failed = sum(1 for report in reports if "failure" in report)
+    total_errors = sum(error_count(report) for report in reports)
+    summary = {
+        "files": len(reports),
+        "failed_files": failed,
+        "errors": total_errors,
+        "seconds": time.perf_counter() - start,
+        "disk_cache_hits": sum(report["disk_cache"]["hits"] for report in reports if "failure" not in report),
+        "disk_cache_misses": sum(report["disk_cache"]["misses"] for report in reports if "failure" not in report),
+    }
+    print("{} files, {} errors, {} failed, {:.1f}s".format(summary["files"], summary["errors"], summary["failed_files"], summary["seconds"]))
+    print("Disk cache: {} hits, {} misses".format(summary["disk_cache_hits"], summary["disk_cache_misses"]))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"summary": summary, "reports": reports}, f, indent=2)
+    if args.junit:
+        write_junit(reports, args.junit)
+
+    return 1 if (failed or total_errors) else 0
+
+
+#
+# Interactive: validate one collection of the saved file in parallel and merge the shards back in
+#
+
+class DCONFIG_OT_validate_sharded(bpy.types.Operator):
+    bl_idname = "dconfig.validate_sharded"
+    bl_label = "DC Validate (Parallel)"
+    bl_description = "Validate the collection of the saved file in parallel background Blender processes"
+
+    jobs: bpy.props.IntProperty(name="Jobs", description="Number of worker processes, 0 for one per CPU", default=0, min=0)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validator = None
+        self.workers = []
+        self.temp_dir = None
+        self.failures = []
+        self.timer = None
+
+    @classmethod
+    def poll(cls, context):
+        return context.collection is not None and bpy.data.filepath and validate.validation_state["validator"] is None
+
+    def invoke(self, context, event):
+        dc.trace_enter(self)
+
+        # Workers load the file from disk and would not see unsaved changes
+        if bpy.data.is_dirty:
+            return dc.warn_canceled(self, "Save the file before validating in parallel")
+
+        self.validator = validate.Validator(context.collection, context.scene.dc_validation_settings)
+        self.validator.prepare(context)
+        validate.validation_state["validator"] = self.validator
+
+        collection = "" if context.collection == context.scene.collection else context.collection.name
+        shard_count = max(1, min(self.jobs or os.cpu_count() or 1, len(self.validator.objs_to_check)))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        try:
+            for index in range(shard_count):
+                output = os.path.join(self.temp_dir.name, "shard_{}.json".format(index))
+                log = open(os.path.join(self.temp_dir.name, "shard_{}.log".format(index)), 'w+')
+                command = worker_command(bpy.app.binary_path, bpy.data.filepath, collection, output)
+                command += ["--scene", context.scene.name, "--shard", str(index), "--shards", str(shard_count)]
+                process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=log)
+                self.workers.append((process, output, log))
+        except BaseException:
+            # Workers already started are stopped again
+            self.cancel(context)
+            raise
+
+        print("Validating {} objects in {} worker processes".format(len(self.validator.objs_to_check), shard_count))
+
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, 1)
+        self.timer = window_manager.event_timer_add(0.1, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            return self.finish(context, True)
+
+        if event.type == 'TIMER':
+            try:
+                return self.collect(context)
+            except BaseException:
+                # A failing merge must not leave the validator claimed or the workers running
+                self.cancel(context)
+                raise
+
+        return {'PASS_THROUGH'}
+
+    def collect(self, context):
+        running = []
+        for process, output, log in self.workers:
+            if process.poll() is None:
+                running.append((process, output, log))
+                continue
+
+            log.seek(0)
+            reports = read_output(output, [bpy.data.filepath], process.returncode, log.read())
+            log.close()
+            for report in reports:
+                if "failure" in report:
+                    self.failures.append(report["failure"])
+                    continue
+                self.validator.merge(read_results(report), report["object_count"], report["disk_cache"], read_skipped(report))
+                for timing in report["timings"]:
+                    self.validator.timings.add(timing["kind"], timing["name"], timing["seconds"], timing["count"])
+
+        # Stream each finished shard into the report
+        self.workers = running
+        self.validator.flush_results()
+        self.validator.validation_data.progress = self.validator.progress
+        context.window_manager.progress_update(self.validator.progress)
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        if not self.workers:
+            return self.finish(context, False)
+
+        return {'PASS_THROUGH'}
+
+    def finish(self, context, cancelled):
+        # Results of the shards which did finish are kept when cancelled
+        try:
+            self.stop_workers()
+            self.validator.finish(cancelled or bool(self.failures))
+        finally:
+            self.release(context)
+
+        if self.failures:
+            for failure in self.failures:
+                print(failure)
+            return dc.warn_canceled(self, "{} of the worker processes failed, see the console", len(self.failures))
+
+        return dc.user_canceled(self) if cancelled else dc.trace_exit(self)
+
+    def cancel(self, context):
+        # Blender cancels the operator when the file is replaced or the window closes; the report may be gone, so only clean up
+        try:
+            self.stop_workers()
+            self.validator.end_run()
+        finally:
+            self.release(context)
+
+    def stop_workers(self):
+        for process, output, log in self.workers:
+            process.kill()
+            process.wait()
+            log.close()
+        self.workers = []
+        if self.temp_dir is not None:
+            self.temp_dir.cleanup()
+            self.temp_dir = None
+
+    def release(self, context):
+        if self.timer is not None:
+            window_manager = context.window_manager
+            window_manager.event_timer_remove(self.timer)
+            window_manager.progress_end()
+            self.timer = None
+        if validate.validation_state["validator"] is self.validator:
+            validate.validation_state["validator"] = None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="DCONFIG_ValidateBatch", description="Validate .blend files in parallel background Blender processes")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--collection", default="")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=3600)
+    parser.add_argument("--json", default="")
+    parser.add_argument("--junit", default="")
+    parser.add_argument("--blender", default="")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--manifest", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--scene", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--shard", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--shards", type=int, default=1, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    return run_worker(args) if args.worker else run_pool(args)
+
+
+if __name__ == "__main__":
+    # Running through blender -P: import this file again as part of the add-on package so relative imports work
+    addon_dir = Path(__file__).resolve().parent
+    sys.path.insert(0, str(addon_dir.parent))
+    batch = importlib.import_module(addon_dir.name + "." + Path(__file__).stem)
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(batch.main(argv))
@@ -0,0 +1,119 @@
+# ------------------------------------------------------------
+# Copyright(c) 2018-2020 Jesse Yurkovich
+# Licensed under the MIT License <http://opensource.org/licenses/MIT>.
+# See the LICENSE file in the repo root for full license information.
+# ------------------------------------------------------------
+
+#
+# On-disk cache of mesh rule measurements, shared between sessions, files and worker processes
+#
+# Each entry is one blob: the length of a JSON header, the header itself with a placeholder for every
+# array, then the raw bytes of those arrays. Element index lists stay as compact as they are in memory.
+#
+
+import json
+import os
+import sqlite3
+import struct
+import time
+
+import bpy
+import numpy as np
+
+
+def default_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES', path="dconfig", create=True), "validation_cache.sqlite")
+
+
+class ArrayEncoder:
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def default(self, value):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            # Indices fit in 32 bits, as they do in the mesh itself
+            if value.dtype.kind == 'i' and value.dtype.itemsize > 4 and (value.size == 0 or (value.min() >= -2**31 and value.max() < 2**31)):
+                value = value.astype(np.int32)
+            data = np.ascontiguousarray(value)
+            placeholder = {"__array__": self.size, "dtype": data.dtype.str, "shape": data.shape}
+            self.chunks.append(data.tobytes())
+            self.size += data.nbytes
+            return placeholder
+        raise TypeError("Cannot cache a measurement of type {}".format(type(value).__name__))
+
+
+def encode_values(values):
+    encoder = ArrayEncoder()
+    header = json.dumps(values, default=encoder.default).encode()
+    return struct.pack('<I', len(header)) + header + b"".join(encoder.chunks)
+
+
+def decode_values(blob):
+    header_size, = struct.unpack_from('<I', blob)
+    body = memoryview(blob)[4 + header_size:]
+
+    def decode_array(obj):
+        if "__array__" not in obj:
+            return obj
+        shape = tuple(obj["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        # Copied so the measurement does not keep the whole blob alive and can be written to
+        return np.frombuffer(body, dtype=np.dtype(obj["dtype"]), count=count, offset=obj["__array__"]).reshape(shape).copy()
+
+    return json.loads(bytes(blob[4:4 + header_size]), object_hook=decode_array)
+
+
+class MeasurementCache:
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stored = {}
+        self.used = set()
+
+        # Several workers may share the file; WAL lets them read while one of them writes
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS measurements (key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS measurements_last_used ON measurements (last_used)")
+
+    def lookup(self, key):
+        # Identical meshes met earlier in the same run, such as linked duplicates with the same modifiers, are hits too
+        if key in self.stored:
+            self.hits += 1
+            return decode_values(self.stored[key])
+
+        row = self.connection.execute("SELECT value FROM measurements WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.used.add(key)
+        return decode_values(row[0])
+
+    def store(self, key, values):
+        self.stored[key] = encode_values(values)
+
+    def close(self):
+        # Everything is written in one transaction at the end of the run, then trimmed to the least recently used
+        now = time.time()
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO measurements (key, value, last_used) VALUES (?, ?, ?)",
+                                        ((key, value, now) for key, value in self.stored.items()))
+            self.connection.executemany("UPDATE measurements SET last_used = ? WHERE key = ?", ((now, key) for key in self.used))
+            self.connection.execute("DELETE FROM measurements WHERE key NOT IN (SELECT key FROM measurements ORDER BY last_used DESC LIMIT ?)",
+                                    (self.max_entries,))
+        self.connection.close()
+
+
+def open_cache(max_entries, path=None):
+    # A cache which cannot be opened only costs speed; validation carries on without it
+    try:
+        return MeasurementCache(path or default_path(), max_entries)
+    except (sqlite3.Error, OSError) as ex:
+        print("Validation disk cache unavailable: {}".format(ex))
+        return None
@@ -0,0 +1,311 @@
+# ------------------------------------------------------------
+# Copyright(c) 2018-2020 Jesse Yurkovich
+# Licensed under the MIT License <http://opensource.org/licenses/MIT>.
+# See the LICENSE file in the repo root for full license information.
+# ------------------------------------------------------------
+
+#
+# Batch fixes for the findings of the last validation run
+#
+# Fixers work once per unique mesh, straight on the mesh data from object mode. A dry run only
+# counts what each fixer would change.
+#
+
+from collections import defaultdict
+
+import bpy
+import bmesh
+from mathutils import Matrix
+import numpy as np
+from . import DCONFIG_MeshArrays as ma
+from . import DCONFIG_Utils as dc
+from . import DCONFIG_Validate as validate
+
+
+def collect_findings(store, rules):
+    # Finding index, object and element set of every stored finding of the given rules whose object can still be edited
+    wanted = [store.rule_lookup[rule] for rule in rules if rule in store.rule_lookup]
+    indices = np.flatnonzero(np.isin(np.frombuffer(store.rule_indices, dtype=np.int32), wanted))
+
+    findings = defaultdict(list)
+    for index in indices.tolist():
+        obj_index = store.obj_indices[index]
+        obj = bpy.data.objects.get(store.obj_names[obj_index]) if obj_index >= 0 else None
+        if obj is None or obj.type != 'MESH' or obj.library is not None or obj.data.library is not None:
+            continue
+
+        # Estimated findings only hold the offending elements of a sample
+        elements = None if index in store.estimated else store.elements.get(index)
+        findings[store.rules[store.rule_indices[index]]].append((index, obj, elements))
+
+    return findings
+
+
+def mesh_users(meshes):
+    # Every object using each mesh, whether it was validated or not
+    users = defaultdict(list)
+    for obj in bpy.data.objects:
+        if obj.type == 'MESH' and obj.data in meshes:
+            users[obj.data].append(obj)
+    return users
+
+
+def rotation_scale(obj):
+    if obj.rotation_mode == 'QUATERNION':
+        rotation = obj.rotation_quaternion.to_matrix()
+    elif obj.rotation_mode == 'AXIS_ANGLE':
+        angle, *axis = obj.rotation_axis_angle
+        rotation = Matrix.Rotation(angle, 3, axis)
+    else:
+        rotation = obj.rotation_euler.to_matrix()
+    return rotation @ Matrix.Diagonal(obj.scale)
+
+
+class MeshVertFix:
+    # Merges doubled vertices, then deletes isolated ones, in a single BMesh pass per mesh
+    def __init__(self, mesh):
+        self.mesh = mesh
+        # Finding indices and element sets of the findings, keyed by rule
+        self.finding_indices = defaultdict(list)
+        self.findings = {}
+        self.targets = None
+        self.isolated = np.empty(0, dtype=np.int32)
+        self.merged = 0
+        self.deleted = 0
+
+    def add(self, rule, index, elements):
+        self.finding_indices[rule].append(index)
+        self.findings[rule] = elements
+
+    def resolve(self, settings):
+        # Doubles are merged with their partners, which the stored indices leave out, so they are always measured again
+        arrays = ma.MeshArrays(self.mesh)
+        if validate.GeometryCoincidentVertRule.rule in self.findings:
+            targets = ma.merge_targets(arrays.positions, settings.coincident_distance)
+            merging = np.flatnonzero(targets != np.arange(arrays.vert_count))
+            self.targets = (merging, targets[merging])
+
+        # Stored isolated vertices are used as found; missing, sampled or out of range ones are measured again
+        if validate.GeometryIsolatedVertRule.rule in self.findings:
+            elements = self.findings[validate.GeometryIsolatedVertRule.rule]
+            if elements is None or (elements.indices.size and int(elements.indices.max()) >= arrays.vert_count):
+                self.isolated = np.flatnonzero(arrays.vert_edge_counts == 0)
+            else:
+                self.isolated = elements.indices
+
+        self.merged = 0 if self.targets is None else len(self.targets[0])
+        self.deleted = len(self.isolated)
+
+    def apply(self):
+        # Counts what was actually merged away and deleted
+        bm = bmesh.new()
+        try:
+            bm.from_mesh(self.mesh)
+            bm.verts.ensure_lookup_table()
+            isolated = [bm.verts[i] for i in self.isolated.tolist()]
+
+            self.merged = 0
+            if self.targets is not None and len(self.targets[0]):
+                verts = bm.verts
+                bmesh.ops.weld_verts(bm, targetmap={verts[i]: verts[t] for i, t in zip(*(a.tolist() for a in self.targets))})
+                self.merged = len(self.targets[0])
+
+            # Merging may already have removed some of them
+            isolated = [v for v in isolated if v.is_valid and not v.link_edges]
+            if isolated:
+                bmesh.ops.delete(bm, geom=isolated, context='VERTS')
+            self.deleted = len(isolated)
+
+            if self.merged or self.deleted:
+                bm.to_mesh(self.mesh)
+        finally:
+            bm.free()
+
+        if self.merged or self.deleted:
+            self.mesh.update()
+
+    def fixed_findings(self):
+        # Only findings whose vertices were actually merged or deleted leave the report
+        fixed = []
+        if self.merged:
+            fixed += self.finding_indices[validate.GeometryCoincidentVertRule.rule]
+        if self.deleted:
+            fixed += self.finding_indices[validate.GeometryIsolatedVertRule.rule]
+        return fixed
+
+
+class FixRun:
+    Vert_Rules = {validate.GeometryCoincidentVertRule.rule, validate.GeometryIsolatedVertRule.rule}
+    Transform_Rule = validate.OrientationTransformRule.rule
+    Data_Name_Rule = validate.ObjectDataNameRule.rule
+
+    def __init__(self, store, settings, fix_doubles=True, fix_isolated=True, fix_transforms=True, fix_data_names=True):
+        self.store = store
+        self.settings = settings
+        self.fix_doubles = fix_doubles
+        self.fix_isolated = fix_isolated
+        self.fix_transforms = fix_transforms
+        self.fix_data_names = fix_data_names
+        self.summary = []
+        self.fixed_findings = []
+        # Meshes whose elements were renumbered by a fix
+        self.changed_meshes = set()
+
+    def run(self, dry_run):
+        rules = set()
+        if self.fix_doubles:
+            rules.add(validate.GeometryCoincidentVertRule.rule)
+        if self.fix_isolated:
+            rules.add(validate.GeometryIsolatedVertRule.rule)
+        if self.fix_transforms:
+            rules.add(self.Transform_Rule)
+        if self.fix_data_names:
+            rules.add(self.Data_Name_Rule)
+        findings = collect_findings(self.store, rules)
+
+        self.fix_verts(findings, dry_run)
+        self.fix_transform(findings.get(self.Transform_Rule, []), dry_run)
+        self.fix_data_name(findings.get(self.Data_Name_Rule, []), dry_run)
+
+        return self.summary
+
+    def fix_verts(self, findings, dry_run):
+        # Users of a mesh share its element indices, so each mesh is fixed once for all of them
+        fixes = {}
+        for rule in self.Vert_Rules:
+            for index, obj, elements in findings.get(rule, []):
+                fix = fixes.get(obj.data)
+                if fix is None:
+                    fix = fixes[obj.data] = MeshVertFix(obj.data)
+                fix.add(rule, index, elements)
+        if not fixes:
+            return
+
+        for fix in fixes.values():
+            fix.resolve(self.settings)
+            if not dry_run:
+                fix.apply()
+                self.fixed_findings += fix.fixed_findings()
+                if fix.merged or fix.deleted:
+                    self.changed_meshes.add(fix.mesh)
+
+        merged = sum(fix.merged for fix in fixes.values())
+        deleted = sum(fix.deleted for fix in fixes.values())
+        if dry_run:
+            self.summary.append("Would merge {} doubled and delete {} isolated vertices on {} meshes".format(merged, deleted, len(fixes)))
+        else:
+            self.summary.append("Merged {} doubled and deleted {} isolated vertices on {} meshes".format(merged, deleted, len(fixes)))
+
+    def fix_transform(self, findings, dry_run):
+        if not findings:
+            return
+
+        # The mesh takes on the rotation and scale, so all of its users must share the same ones
+        finding_indices = defaultdict(list)
+        for index, obj, _ in findings:
+            finding_indices[obj.data].append(index)
+
+        applied = []
+        skipped = []
+        for mesh, users in mesh_users(set(finding_indices)).items():
+            matrices = [rotation_scale(obj) for obj in users]
+            if any(not np.allclose(matrices[0], matrix, atol=1e-6) for matrix in matrices[1:]):
+                skipped.append(mesh)
+                continue
+
+            applied.append((mesh, users, matrices[0]))
+
+        object_count = sum(len(users) for _, users, _ in applied)
+        if dry_run:
+            self.summary.append("Would apply rotation and scale of {} objects on {} meshes".format(object_count, len(applied)))
+        else:
+            for mesh, users, matrix in applied:
+                self.apply_transform(mesh, users, matrix)
+                self.fixed_findings += finding_indices[mesh]
+            self.summary.append("Applied rotation and scale of {} objects on {} meshes".format(object_count, len(applied)))
+
+        if skipped:
+            self.summary.append("Skipped {} meshes shared by objects with different rotation or scale".format(len(skipped)))
+
+    def apply_transform(self, mesh, users, matrix):
+        matrix = matrix.to_4x4()
+        mesh.transform(matrix, shape_keys=True)
+        if matrix.determinant() < 0:
+            # Mirroring turns the faces inside out
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
+            bmesh.ops.reverse_faces(bm, faces=bm.faces[:])
+            bm.to_mesh(mesh)
+            bm.free()
+        mesh.update()
+
+        for obj in users:
+            obj.rotation_euler = (0, 0, 0)
+            obj.rotation_quaternion = (1, 0, 0, 0)
+            obj.rotation_axis_angle = (0, 0, 1, 0)
+            obj.scale = (1, 1, 1)
+
+            # Children keep their place in the world
+            for child in obj.children:
+                child.matrix_parent_inverse = matrix @ child.matrix_parent_inverse
+
+    def fix_data_name(self, findings, dry_run):
+        # Only single-user data is renamed after its object; shared data has no one name to take
+        renames = [(index, obj) for index, obj, _ in findings if obj.data.users < 2 and obj.data.name != obj.name]
+        if not renames:
+            return
+
+        if dry_run:
+            self.summary.append("Would rename the data of {} objects".format(len(renames)))
+            return
+
+        for index, obj in renames:
+            obj.data.name = obj.name
+            self.fixed_findings.append(index)
+        self.summary.append("Renamed the data of {} objects".format(len(renames)))
+
+
+class DCONFIG_OT_validation_fix(bpy.types.Operator):
+    bl_idname = "dconfig.validation_fix"
+    bl_label = "DC Fix All"
+    bl_description = "Fix the findings of the last validation which can be fixed automatically"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: bpy.props.BoolProperty(name="Dry Run", description="Only report what would be changed", default=False)
+    fix_doubles: bpy.props.BoolProperty(name="Merge Doubles", description="Merge coincident vertices", default=True)
+    fix_isolated: bpy.props.BoolProperty(name="Delete Isolated", description="Delete vertices without edges", default=True)
+    fix_transforms: bpy.props.BoolProperty(name="Apply Rotation & Scale", description="Apply unapplied rotation and scale to the mesh data", default=True)
+    fix_data_names: bpy.props.BoolProperty(name="Rename Data", description="Rename single-user data to match its object", default=True)
+
+    @classmethod
+    def poll(cls, context):
+        return len(validate.get_result_store(context.scene)) > 0 and validate.validation_state["validator"] is None
+
+    def execute(self, context):
+        dc.trace_enter(self)
+
+        # Mesh data is written directly, which edit mode would overwrite
+        if not self.dry_run and context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        store = validate.get_result_store(context.scene)
+        fix_run = FixRun(store, context.scene.dc_validation_settings, self.fix_doubles, self.fix_isolated, self.fix_transforms, self.fix_data_names)
+        summary = fix_run.run(self.dry_run)
+        if not summary:
+            return dc.warn_canceled(self, "Nothing to fix in the validation report")
+
+        for line in summary:
+            print(line)
+        self.report({'INFO'}, "; ".join(summary))
+
+        # Element indices of other findings on meshes which lost vertices no longer point at the right elements
+        if fix_run.changed_meshes:
+            stale_objs = [obj.name for users in mesh_users(fix_run.changed_meshes).values() for obj in users]
+            store.forget_elements(stale_objs)
+
+        # Fixed findings leave the report; a new validation confirms the rest
+        if fix_run.fixed_findings:
+            store.remove(fix_run.fixed_findings)
+        context.scene.dc_validation_data.refresh(store)
+
+        return dc.trace_exit(self)
@@ -0,0 +1,173 @@
+# ------------------------------------------------------------
+# Copyright(c) 2018-2020 Jesse Yurkovich
+# Licensed under the MIT License <http://opensource.org/licenses/MIT>.
+# See the LICENSE file in the repo root for full license information.
+# ------------------------------------------------------------
+
+#
+# Viewport overlay of the findings of the last validation run
+#
+# Every flagged vertex is drawn as a point and every flagged edge or face side as a line, colored by
+# rule category. All markers live in one points batch and one lines batch, rebuilt only when the
+# result store changes and no run is posting to it, so the draw callback itself is just two draw calls.
+#
+
+import bpy
+import gpu
+from gpu_extras.batch import batch_for_shader
+import numpy as np
+from . import DCONFIG_MeshArrays as ma
+from . import DCONFIG_Validate as validate
+
+Category_Colors = {
+    'Geometry': (1.0, 0.2, 0.2, 1.0),
+    'Topology': (1.0, 0.6, 0.1, 1.0),
+    'Material': (0.9, 0.3, 0.9, 1.0),
+    'Orientation': (0.2, 0.6, 1.0, 1.0),
+    'Organization': (1.0, 0.9, 0.2, 1.0),
+}
+Default_Color = (1.0, 1.0, 1.0, 1.0)
+
+overlay_state = {
+    "handler": None,
+    "key": None,
+    "points": None,
+    "lines": None,
+}
+
+
+def builtin_shader(name, fallback):
+    # (shader, whether it is the one asked for); older versions lack some builtins
+    try:
+        return gpu.shader.from_builtin(name), True
+    except ValueError:
+        return gpu.shader.from_builtin(fallback), False
+
+
+def get_shaders():
+    # Point and line widths only reach plain shaders under OpenGL; the point and polyline shaders size their markers on Metal and Vulkan too
+    flat = 'FLAT_COLOR' if bpy.app.version >= (3, 4, 0) else '3D_FLAT_COLOR'
+    polyline = 'POLYLINE_FLAT_COLOR' if bpy.app.version >= (3, 4, 0) else '3D_POLYLINE_FLAT_COLOR'
+    point_shader, _ = builtin_shader('POINT_FLAT_COLOR', flat)
+    line_shader, is_polyline = builtin_shader(polyline, flat)
+    return point_shader, line_shader, is_polyline
+
+
+class MarkerBuilder:
+    def __init__(self):
+        self.points = []
+        self.point_colors = []
+        self.lines = []
+        self.line_colors = []
+        self.world_positions = {}
+
+    def positions(self, obj):
+        # World space vertex positions, computed once per object however many findings it has
+        entry = self.world_positions.get(obj.name)
+        if entry is None:
+            arrays = ma.MeshArrays(obj.data)
+            matrix = np.array(obj.matrix_world, dtype=np.float32)
+            entry = self.world_positions[obj.name] = (arrays, arrays.positions @ matrix[:3, :3].T + matrix[:3, 3])
+        return entry
+
+    def add_finding(self, obj, color, elements):
+        # Findings about the object as a whole, or without stored elements, mark its origin
+        if elements is None or obj.type != 'MESH':
+            self.points.append(np.array([obj.matrix_world.translation], dtype=np.float32))
+            self.point_colors.append(np.tile(np.float32(color), (1, 1)))
+            return
+
+        arrays, positions = self.positions(obj)
+        indices = elements.indices
+        if elements.domain == 'VERT':
+            domain_size = arrays.vert_count
+        elif elements.domain == 'EDGE':
+            domain_size = arrays.edge_count
+        else:
+            domain_size = arrays.face_count
+
+        # The mesh changed since it was validated; its markers come back with the next run
+        if indices.size == 0 or int(indices.max()) >= domain_size:
+            return
+
+        if elements.domain == 'VERT':
+            self.points.append(positions[indices])
+            self.point_colors.append(np.tile(np.float32(color), (indices.size, 1)))
+        else:
+            edge_verts = arrays.edge_verts[indices] if elements.domain == 'EDGE' else ma.face_edge_verts(arrays, indices)
+            self.lines.append(positions[edge_verts].reshape(-1, 3))
+            self.line_colors.append(np.tile(np.float32(color), (edge_verts.size, 1)))
+
+    def make_batches(self, point_shader, line_shader):
+        points = None
+        if self.points:
+            points = batch_for_shader(point_shader, 'POINTS', {"pos": np.concatenate(self.points), "color": np.concatenate(self.point_colors)})
+        lines = None
+        if self.lines:
+            lines = batch_for_shader(line_shader, 'LINES', {"pos": np.concatenate(self.lines), "color": np.concatenate(self.line_colors)})
+        return points, lines
+
+
+def build_batches(scene, store, point_shader, line_shader):
+    builder = MarkerBuilder()
+    for index in range(len(store)):
+        obj_index = store.obj_indices[index]
+        if obj_index < 0:
+            continue
+
+        # Objects which were removed or renamed since are skipped
+        obj = scene.objects.get(store.obj_names[obj_index])
+        if obj is None:
+            continue
+
+        color = Category_Colors.get(store.rules[store.rule_indices[index]].category, Default_Color)
+        builder.add_finding(obj, color, store.elements.get(index))
+
+    return builder.make_batches(point_shader, line_shader)
+
+
+def draw_overlay():
+    scene = bpy.context.scene
+    if not scene.dc_validation_settings.show_overlay:
+        return
+
+    # Markers follow the results, not every edit; watch mode or a new run moves them along with the geometry.
+    # A running validation posts to the store on every tick, so the markers wait for it to finish
+    point_shader, line_shader, is_polyline = get_shaders()
+    store = validate.get_result_store(scene)
+    key = (scene.session_uid, store.version)
+    if overlay_state["key"] != key and validate.validation_state["validator"] is None:
+        overlay_state["points"], overlay_state["lines"] = build_batches(scene, store, point_shader, line_shader)
+        overlay_state["key"] = key
+
+    if overlay_state["points"] is None and overlay_state["lines"] is None:
+        return
+
+    # Drawn on top of the geometry so problems inside or behind other objects still show
+    gpu.state.blend_set('ALPHA')
+    gpu.state.depth_test_set('NONE')
+    gpu.state.point_size_set(6.0)
+    gpu.state.line_width_set(2.0)
+
+    if overlay_state["lines"] is not None:
+        line_shader.bind()
+        if is_polyline:
+            line_shader.uniform_float("viewportSize", gpu.state.viewport_get()[2:])
+            line_shader.uniform_float("lineWidth", 2.0)
+        overlay_state["lines"].draw(line_shader)
+    if overlay_state["points"] is not None:
+        point_shader.bind()
+        overlay_state["points"].draw(point_shader)
+
+    gpu.state.line_width_set(1.0)
+    gpu.state.point_size_set(1.0)
+    gpu.state.blend_set('NONE')
+
+
+def register():
+    overlay_state["handler"] = bpy.types.SpaceView3D.draw_handler_add(draw_overlay, (), 'WINDOW', 'POST_VIEW')
+
+
+def unregister():
+    bpy.types.SpaceView3D.draw_handler_remove(overlay_state["handler"], 'WINDOW')
+    overlay_state.update(handler=None, key=None, points=None, lines=None)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The NumPy kernels import without Blender, straight from the add-on directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
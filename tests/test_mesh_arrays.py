@@ -0,0 +1,127 @@
+import time
+import types
+import tracemalloc
+
+import numpy as np
+import DCONFIG_MeshArrays as ma
+
+
+def measure_overlap(tris, groups):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        overlapped = ma.find_overlapping_triangles(tris, groups)
+        return overlapped, time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_uv_overlap_stacked_triangles_stay_bounded():
+    tri = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+    count = 16000
+    overlapped, seconds, peak = measure_overlap(np.tile(tri, (count, 1, 1)), np.arange(count))
+    assert len(overlapped) == count
+    assert seconds < 5.0
+    assert peak < 100 * 1024 * 1024
+
+
+def test_uv_overlap_collapsed_triangles_never_overlap():
+    overlapped, seconds, peak = measure_overlap(np.zeros((16000, 3, 2)), np.arange(16000))
+    assert len(overlapped) == 0
+    assert peak < 100 * 1024 * 1024
+
+
+def test_uv_overlap_large_triangle_among_small_ones():
+    rng = np.random.default_rng(0)
+    count = 20000
+    small = rng.random((count, 1, 2)) * 0.9 + rng.random((count, 3, 2)) * 0.005 + 0.05
+    quad = np.array([[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]], [[0.0, 0.0], [1.0, 1.0], [0.0, 1.0]]])
+    groups = np.concatenate((np.arange(count), [count, count]))
+    overlapped, seconds, peak = measure_overlap(np.concatenate((small, quad)), groups)
+
+    # Every small triangle lies inside the quad
+    assert len(overlapped) == count + 2
+    assert seconds < 5.0
+    assert peak < 200 * 1024 * 1024
+
+
+def test_uv_overlap_ignores_same_group_and_touching():
+    tris = np.array([
+        [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]],
+        [[1.0, 0.0], [1.0, 1.0], [0.0, 1.0]],
+        [[0.0, 0.0], [0.0, 1.0], [1.0, 0.0]],
+    ])
+    assert ma.find_overlapping_triangles(tris, [0, 1, 0]).size == 0
+    assert sorted(ma.find_overlapping_triangles(tris, [0, 1, 2]).tolist()) == [0, 2]
+
+
+def test_coincident_owner_pairs_stacked_copies_stay_bounded():
+    rng = np.random.default_rng(0)
+    copies, verts = 80, 2000
+    positions = np.tile(rng.random((verts, 3)), (copies, 1))
+    owners = np.repeat(np.arange(copies), verts)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        owner_a, owner_b, counts = ma.find_coincident_owner_pairs(positions, owners, 0.0001)
+        seconds, peak = time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(counts) == copies * (copies - 1) // 2
+    assert np.all(counts == verts)
+    assert seconds < 5.0
+    assert peak < 200 * 1024 * 1024
+
+
+def test_coincident_owner_pairs_counts_point_pairs():
+    positions = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.05], [5.0, 0.0, 0.0]])
+    owners = np.array([0, 0, 1, 1, 2, 2])
+    owner_a, owner_b, counts = ma.find_coincident_owner_pairs(positions, owners, 0.1)
+    assert dict(zip(zip(owner_a.tolist(), owner_b.tolist()), counts.tolist())) == {(0, 1): 2, (1, 2): 1}
+
+
+def triangle_mesh(positions, faces):
+    faces = np.asarray(faces, dtype=np.int64)
+    loops = np.arange(faces.size).reshape(-1, 3)
+    return types.SimpleNamespace(
+        positions=np.asarray(positions, dtype=np.float32), loop_verts=faces.ravel(),
+        loop_starts=loops[:, 0], face_sizes=np.full(len(faces), 3), loop_triangles=loops,
+        loop_triangle_faces=np.arange(len(faces)), vert_count=len(positions), face_count=len(faces))
+
+
+def corner_intersections(arrays):
+    a, b = np.triu_indices(arrays.face_count, 1)
+    counts, verts = ma.face_pair_shared_verts(arrays, a, b)
+    corner = counts == 1
+    meets = ma.faces_meet_apart_from(arrays, a[corner], b[corner], verts[corner])
+    return set(zip(a[corner][meets].tolist(), b[corner][meets].tolist()))
+
+
+def fan_positions(count):
+    angles = np.linspace(0.0, 2.0 * np.pi, count, endpoint=False)
+    return np.vstack(([0.0, 0.0, 0.0], np.column_stack((np.cos(angles), np.sin(angles), np.zeros(count)))))
+
+
+def test_self_intersection_flat_fan_only_touches():
+    arrays = triangle_mesh(fan_positions(6), [[0, i + 1, (i + 1) % 6 + 1] for i in range(6)])
+    counts, verts = ma.face_pair_shared_verts(arrays, *np.triu_indices(6, 1))
+    assert sorted(counts.tolist()) == [1] * 9 + [2] * 6
+    assert corner_intersections(arrays) == set()
+
+
+def test_self_intersection_folded_fan_is_reported():
+    # The last fan face is folded back over the first, piercing it through the shared center vertex
+    positions = fan_positions(6)
+    positions[5] = [0.6, 0.3, 0.5]
+    positions[6] = [0.6, 0.3, -0.5]
+    arrays = triangle_mesh(positions, [[0, 1, 2], [0, 2, 3], [0, 3, 4], [0, 5, 6]])
+    assert corner_intersections(arrays) == {(0, 3)}
+
+
+def test_self_intersection_coplanar_fold_is_reported():
+    # A face flipped over in the plane of its neighbour overlaps it while only sharing the corner
+    positions = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 0.5, 0.0], [0.5, 1.0, 0.0], [-1.0, 0.2, 0.0], [-0.2, -1.0, 0.0]]
+    arrays = triangle_mesh(positions, [[0, 1, 2], [0, 3, 4], [0, 5, 6]])
+    assert corner_intersections(arrays) == {(0, 1)}